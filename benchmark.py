@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ======================================================================
+#	Benchmarks for cmakegen
+# ======================================================================
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import cmakegen
+
+# ----------------------------------------------------------------------
+#	Constants
+# ----------------------------------------------------------------------
+STAGES = [
+	"save_json",
+	"save_compact",
+	"load_json",
+	"load_compact",
+	"set_path",
+	"render",
+	"generate_cold",
+	"generate_warm",
+	"scan_cold",
+	"scan_warm",
+]
+
+# ----------------------------------------------------------------------
+##	Build a synthetic solution
+#	@param	root		Solution directory
+#	@param	projects	Number of projects
+#	@param	sources		Sources per project
+#	@param	platforms	Platforms enabled on each project and entry
+def make_solution(root, projects, sources, platforms):
+	sln = cmakegen.solution()
+	sln.name = "Bench"
+	sln.path = root
+	names = cmakegen.SUPPORT_PLATFORMS[:platforms]
+	for p in range(projects):
+		proj = sln.new_project()
+		proj.platform = list(names)
+		for i in range(sources):
+			info = cmakegen.path_info(os.path.join(root, f"src/p{p}/m{i % 64}/file{i}.cpp"), sln.root)
+			info.platform = names
+			proj.sources.append(info)
+		for i in range(max(1, sources // 256)):
+			info = cmakegen.path_info(os.path.join(root, f"include/p{p}/i{i}"), sln.root)
+			info.platform = names
+			proj.include_dirs.append(info)
+	return sln
+
+# ----------------------------------------------------------------------
+##	Create files on disk for the scan stages
+def make_tree(root, files):
+	for i in range(files):
+		dirname = os.path.join(root, "tree", f"d{i % 97}", f"s{i % 13}")
+		os.makedirs(dirname, exist_ok=True)
+		open(os.path.join(dirname, f"f{i}.cpp"), 'w').close()
+
+# ----------------------------------------------------------------------
+##	Run each stage once
+#	@param	trace	Record the peak traced memory of each stage instead of only timing it
+#	@return	Dict of stage -> {'seconds', 'peak_bytes'}
+def run_stages(args, trace):
+	results = {}
+	workdir = tempfile.mkdtemp(prefix="cmakegen-bench-")
+	try:
+		root = os.path.join(workdir, "solution")
+		os.makedirs(root)
+		sln = make_solution(root, args.projects, args.sources, args.platforms)
+		json_path = os.path.join(root, cmakegen.FILENAME_CONFIG)
+		compact_path = os.path.join(root, cmakegen.FILENAME_CONFIG_COMPACT)
+		loaded = {}
+		index = {}
+		rules = cmakegen.glob_rules(["tree/**/*.cpp"])
+		if args.scan_files:
+			make_tree(root, args.scan_files)
+
+		def stage_save_json():
+			sln.save()
+		def stage_save_compact():
+			sln.save(True)
+		def stage_load_json():
+			loaded['json'] = cmakegen.solution()
+			loaded['json'].load(json_path)
+		def stage_load_compact():
+			loaded['compact'] = cmakegen.solution()
+			loaded['compact'].load(compact_path)
+		def stage_set_path():
+			loaded['compact'].set_path(os.path.join(workdir, "moved"))
+		def stage_render():
+			for proj in loaded['compact'].projects:
+				for info in proj.sources:
+					info.path
+		def stage_generate():
+			success, message = sln.generate_cmake()
+			if not success:
+				raise RuntimeError(message)
+		def stage_scan_cold():
+			index['tree'] = cmakegen.tree_index(root)
+			index['tree'].scan(rules)
+			index['tree'].save()
+		def stage_scan_warm():
+			cmakegen.tree_index(root).scan(rules)
+
+		stages = {
+			"save_json": stage_save_json,
+			"save_compact": stage_save_compact,
+			"load_json": stage_load_json,
+			"load_compact": stage_load_compact,
+			"set_path": stage_set_path,
+			"render": stage_render,
+			"generate_cold": stage_generate,
+			"generate_warm": stage_generate,
+			"scan_cold": stage_scan_cold,
+			"scan_warm": stage_scan_warm,
+		}
+		for name in STAGES:
+			if name.startswith("scan") and not args.scan_files:
+				continue
+			if trace:
+				tracemalloc.start()
+			start = time.perf_counter()
+			stages[name]()
+			seconds = time.perf_counter() - start
+			peak = 0
+			if trace:
+				peak = tracemalloc.get_traced_memory()[1]
+				tracemalloc.stop()
+			results[name] = {'seconds': seconds, 'peak_bytes': peak}
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+	return results
+
+# ----------------------------------------------------------------------
+##	Best time over the repeats, plus the peak memory of a traced run
+def run_benchmark(args):
+	results = None
+	for n in range(args.repeat):
+		timings = run_stages(args, False)
+		if results is None:
+			results = timings
+		else:
+			for name, value in timings.items():
+				results[name]['seconds'] = min(results[name]['seconds'], value['seconds'])
+	if args.memory:
+		for name, value in run_stages(args, True).items():
+			results[name]['peak_bytes'] = value['peak_bytes']
+	return results
+
+# ----------------------------------------------------------------------
+##	Print results, compared against a baseline when given
+#	@return	Array of stage names slower than the tolerance allows
+def report(results, entries, scan_files, baseline, tolerance):
+	regressions = []
+	sys.stdout.write(f"{'stage':<16}{'seconds':>10}{'entries/s':>14}{'peak MB':>10}{'baseline':>12}\n")
+	for name in STAGES:
+		if name not in results:
+			continue
+		seconds = results[name]['seconds']
+		count = scan_files if name.startswith("scan") else entries
+		rate = count / seconds if seconds > 0 else float('inf')
+		peak = results[name]['peak_bytes'] / (1024 * 1024)
+		line = f"{name:<16}{seconds:>10.4f}{rate:>14.0f}{peak:>10.1f}"
+		if baseline is not None and name in baseline:
+			base = baseline[name]['seconds']
+			change = (seconds - base) / base if base > 0 else 0.0
+			line += f"{change:>+11.1%}"
+			# Sub-millisecond stages are too noisy to flag
+			if change > tolerance and max(seconds, base) >= 0.001:
+				line += "  REGRESSION"
+				regressions.append(name)
+		sys.stdout.write(line + "\n")
+	return regressions
+
+# ----------------------------------------------------------------------
+def parse_args(argv):
+	parser = argparse.ArgumentParser(description="Benchmark cmakegen load, save, rebase, scan and generate")
+	parser.add_argument("--projects", type=int, default=4, help="projects in the synthetic solution")
+	parser.add_argument("--sources", type=int, default=25000, help="sources per project")
+	parser.add_argument("--platforms", type=int, default=2, choices=range(1, len(cmakegen.SUPPORT_PLATFORMS) + 1),
+		help="platforms enabled on every entry")
+	parser.add_argument("--scan-files", type=int, default=5000, help="files created for the scan stages, 0 to skip")
+	parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the best time is kept")
+	parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the traced run for peak memory")
+	parser.add_argument("--baseline", help="JSON results to compare against")
+	parser.add_argument("--save-baseline", help="write the results as JSON to this file")
+	parser.add_argument("--tolerance", type=float, default=0.2,
+		help="relative slowdown against the baseline reported as a regression")
+	return parser.parse_args(argv)
+
+# ----------------------------------------------------------------------
+def run(argv):
+	args = parse_args(argv)
+	baseline = None
+	if args.baseline:
+		with open(args.baseline, 'r') as infile:
+			baseline = json.load(infile)['stages']
+	results = run_benchmark(args)
+	entries = args.projects * args.sources
+	sys.stdout.write(f"{args.projects} project(s) x {args.sources} source(s) x {args.platforms} platform(s)\n")
+	regressions = report(results, entries, args.scan_files, baseline, args.tolerance)
+	if args.save_baseline:
+		with open(args.save_baseline, 'w') as outfile:
+			json.dump({'params': vars(args), 'stages': results}, outfile, indent=1)
+	return 1 if regressions else 0
+
+if __name__ == "__main__":
+	sys.exit(run(sys.argv[1:]))
@@ -4,9 +4,24 @@
 #	CMake generator
 # ======================================================================
 import os
+import re
+import posixpath
 import sys
 import json
-import flet
+import stat
+import time
+import shutil
+import struct
+import select
+import ctypes
+import ctypes.util
+import hashlib
+import bisect
+import cProfile
+import argparse
+import tempfile
+import contextlib
+import concurrent.futures
 
 # ----------------------------------------------------------------------
 #	Constants
@@ -24,6 +39,21 @@ EXTENSIONS_CPP=[
 	"cxx",
 ]
 
+PLATFORM_BITS = {name: 1 << idx for idx, name in enumerate(SUPPORT_PLATFORMS)}
+PLATFORM_ALL = (1 << len(SUPPORT_PLATFORMS)) - 1
+PLATFORM_NAMES = {}	# Bitmask -> tuple of names, filled by platform_names()
+
+PLATFORM_CMAKE_CONDITIONS = {
+	"Windows": "WIN32",
+	"MacOS": "APPLE",
+	"Linux": "UNIX AND NOT APPLE",
+}
+PLATFORM_HOST_NAMES = {		# ${hostSystemName} of each platform in CMakePresets.json
+	"Windows": "Windows",
+	"MacOS": "Darwin",
+	"Linux": "Linux",
+}
+
 CXXSTANDARD= [
 	"default",
 	"C++11",
@@ -40,7 +70,123 @@ PATHINFO_TYPE_ENV      = 3
 LISTVIEW_TYPE_DIRS  = 0
 LISTVIEW_TYPE_FILES = 1
 
+LISTVIEW_PAGE_SIZE = 100	# Rows materialized at once by listview_path
+
+CMAKE_LAYOUT_SINGLE       = "single"
+CMAKE_LAYOUT_SUBDIRECTORY = "subdirectory"
+CMAKE_LAYOUTS = [
+	CMAKE_LAYOUT_SINGLE,
+	CMAKE_LAYOUT_SUBDIRECTORY,
+]
+
+PROJECT_EXECUTABLE = "executable"
+PROJECT_STATIC     = "static"
+PROJECT_SHARED     = "shared"
+PROJECT_OBJECT     = "object"
+PROJECT_TYPES = [
+	PROJECT_EXECUTABLE,
+	PROJECT_STATIC,
+	PROJECT_SHARED,
+	PROJECT_OBJECT,
+]
+
+UNITY_OFF   = "off"
+UNITY_CMAKE = "cmake"		# UNITY_BUILD target property, batched by CMake
+UNITY_FILES = "files"		# Batch files written by the generator
+UNITY_MODES = [
+	UNITY_OFF,
+	UNITY_CMAKE,
+	UNITY_FILES,
+]
+UNITY_BATCH_SIZE = 16
+UNITY_DIR_NAME_MAX = 48		# Longest directory part of a unity batch file name
+
+LAUNCHER_NONE    = "none"
+LAUNCHER_AUTO    = "auto"		# The first of LAUNCHER_PROGRAMS found on PATH when generating
+LAUNCHER_CCACHE  = "ccache"
+LAUNCHER_SCCACHE = "sccache"
+LAUNCHER_PROGRAMS = [
+	LAUNCHER_SCCACHE,
+	LAUNCHER_CCACHE,
+]
+LAUNCHERS = [LAUNCHER_NONE, LAUNCHER_AUTO] + LAUNCHER_PROGRAMS
+
+LINKER_DEFAULT = "default"
+LINKER_LLD     = "lld"
+LINKER_MOLD    = "mold"
+LINKERS = [
+	LINKER_DEFAULT,
+	LINKER_LLD,
+	LINKER_MOLD,
+]
+
+PRESET_NONE        = "none"
+PRESET_NINJA       = "Ninja"
+PRESET_NINJA_MULTI = "Ninja Multi-Config"
+PRESET_GENERATORS = [
+	PRESET_NONE,
+	PRESET_NINJA,
+	PRESET_NINJA_MULTI,
+]
+PRESET_BUILD_TYPES = [
+	"Debug",
+	"Release",
+	"RelWithDebInfo",
+]
+PRESET_VERSION = 3		# CMake 3.21, for build preset conditions
+PRESET_VENDOR = "cmakegen"	# Vendor key marking a CMakePresets.json as generated, so it may be overwritten
+
 FILENAME_CONFIG = "CMakeConfig.json"
+FILENAME_CONFIG_COMPACT = "CMakeConfig.cmgc"
+CONFIG_FORMAT_COMPACT = "cmakegen-compact"
+CONFIG_COMPACT_VERSION = 1
+FILENAME_CMAKE = "CMakeLists.txt"
+CMAKE_GENERATED_MARKER = "# Generated by cmakegen, do not edit"	# First line of every CMakeLists.txt written
+FILENAME_PRESETS = "CMakePresets.json"
+FILENAME_DIGEST_CACHE = ".cmakegen_digest.json"
+FILENAME_INDEX = "CMakeConfig.index.json"
+FILENAME_CMAKE_CACHE = "CMakeCache.txt"	# Marks a CMake build tree, never scanned nor watched
+DIRNAME_CMAKE_FILES = "CMakeFiles"		# CMake's own files in a build tree, also in-source
+DIRNAME_GENERATED = ".cmakegen"	# Unity batch files and PCH headers, one subdirectory per project
+FILENAME_INCLUDE_CACHE = ".cmakegen_includes.json"
+INCLUDE_CACHE_VERSION = 2
+FILENAME_PCH = "pch.h"
+
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+SCAN_WORKERS = 16
+SCAN_RACY_NS = 2 * 1000000000	# Directories modified this recently are rescanned next time
+
+ENV_PROFILE  = "CMAKEGEN_PROFILE"	# Path of the JSON timing report, same as --profile
+ENV_CPROFILE = "CMAKEGEN_CPROFILE"	# Path of the cProfile dump, same as --cprofile
+
+INCLUDE_PARSE_PARALLEL = 256	# Files to parse at once before worker processes are used
+EXTENSIONS_HEADER = [
+	"h",
+	"hh",
+	"hpp",
+	"hxx",
+	"inl",
+]
+RE_DIRECTIVE = re.compile(rb'^[ \t]*#[ \t]*(include|if|ifdef|ifndef|endif)\b[ \t]*(?:([<"])([^>"\r\n]+)[>"])?', re.MULTILINE)
+
+PCH_MAX_HEADERS = 32
+
+WATCH_DEBOUNCE = 0.3		# Seconds without events before regenerating
+WATCH_POLL_INTERVAL = 1.0	# Seconds between polls of the polling watcher
+
+IN_MODIFY      = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = 0o4000
+IN_CLOEXEC     = 0o2000000
 
 # ----------------------------------------------------------------------
 #	Modern UI Constants
@@ -67,32 +213,879 @@ COLORS = {
 # ----------------------------------------------------------------------
 current_solution = None
 current_window = None
+flet = None			# Imported lazily by run_gui()
+current_profiler = None	# Set by run() when profiling is enabled
 
 # ----------------------------------------------------------------------
-def to_dict(obj):
-	if isinstance(obj, dict):
-		out = {}
-		for key, val in obj.items():
-			out[key] = to_dict(val)
-		return out
-	elif isinstance(obj, list):
-		out = []
-		for val in obj:
-			out.append(to_dict(val))
+##	Per-phase timings and per-project counts
+#	Phases may nest: 'seconds' includes nested phases, 'self_seconds' does not.
+class profiler:
+	"""Constructor"""
+	def __init__(self):
+		self.phases = {}
+		self.projects = {}
+		self.configs = []
+		self.stack = []
+		self.start = time.perf_counter()
+
+	def enter(self, name):
+		self.stack.append([name, time.perf_counter(), 0.0])
+
+	def leave(self):
+		name, start, nested = self.stack.pop()
+		seconds = time.perf_counter() - start
+		record = self.phases.get(name)
+		if record is None:
+			record = self.phases[name] = {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0}
+		record['calls'] += 1
+		record['seconds'] += seconds
+		record['self_seconds'] += seconds - nested
+		if self.stack:
+			self.stack[-1][2] += seconds
+
+	@contextlib.contextmanager
+	def phase(self, name):
+		self.enter(name)
+		try:
+			yield
+		finally:
+			self.leave()
+
+	def timed(self, name, iterable):
+		"""Yield from iterable, timing each step as the phase name"""
+		it = iter(iterable)
+		while True:
+			self.enter(name)
+			try:
+				item = next(it, self)
+			finally:
+				self.leave()
+			if item is self:
+				return
+			yield item
+
+	def count(self, proj, **counts):
+		self.projects.setdefault(proj, {}).update(counts)
+
+	def merge(self, config, data):
+		"""Add the report of one config, generated by this or another process"""
+		self.configs.append(dict(data, config=config))
+		for name, value in data['phases'].items():
+			record = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0})
+			for key in record:
+				record[key] += value[key]
+
+	def todict(self):
+		out = {
+			'seconds': time.perf_counter() - self.start,
+			'phases': self.phases,
+			'projects': self.projects,
+		}
+		if self.configs:
+			out['configs'] = self.configs
 		return out
-	elif hasattr(obj, "__dict__"):
-		temp = obj.__dict__
+
+	def save(self, filepath, argv=None):
+		data = self.todict()
+		if argv is not None:
+			data['argv'] = argv
+		with open(filepath, 'w') as outfile:
+			json.dump(data, outfile, indent=1)
+
+##	Time a phase when profiling is enabled
+def profile_phase(name):
+	if current_profiler is None:
+		return contextlib.nullcontext()
+	return current_profiler.phase(name)
+
+##	Record counts of a project when profiling is enabled
+def profile_count(proj, **counts):
+	if current_profiler is not None:
+		current_profiler.count(proj, **counts)
+
+##	Start profiling in a worker process
+def enable_profiler():
+	global current_profiler
+	current_profiler = profiler()
+
+# ----------------------------------------------------------------------
+##	Config schema
+#	Each class lists its saved fields as (name, kind) or (name, kind, default);
+#	fields with a default may be missing from older configs.
+#	A kind of [cls] is a list of cls objects described by cls.SCHEMA.
+FIELD_INT          = "integer"
+FIELD_STR          = "string"
+FIELD_OPTIONAL_STR = "string or null"
+FIELD_STR_LIST     = "list of strings"
+
+def _encode_int(value):
+	return str(value)
+
+def _encode_str(value):
+	return json.encoder.encode_basestring_ascii(value)
+
+def _encode_optional_str(value):
+	return 'null' if value is None else json.encoder.encode_basestring_ascii(value)
+
+def _encode_str_list(value):
+	return '[' + ','.join(map(json.encoder.encode_basestring_ascii, value)) + ']'
+
+SCHEMA_ENCODERS = {
+	FIELD_INT: _encode_int,
+	FIELD_STR: _encode_str,
+	FIELD_OPTIONAL_STR: _encode_optional_str,
+	FIELD_STR_LIST: _encode_str_list,
+}
+
+# ----------------------------------------------------------------------
+##	Check a loaded value against a field kind
+#	@param	where	Location used in the error message, e.g. "projects[1].sources[3].path"
+def schema_check(value, kind, where):
+	if kind == FIELD_INT:
+		valid = type(value) is int
+	elif kind == FIELD_STR:
+		valid = isinstance(value, str)
+	elif kind == FIELD_OPTIONAL_STR:
+		valid = value is None or isinstance(value, str)
+	elif kind == FIELD_STR_LIST:
+		valid = isinstance(value, list) and all(isinstance(item, str) for item in value)
+	else:
+		valid = isinstance(value, list)
+	if not valid:
+		raise ValueError(f"{where}: expected {schema_kind_name(kind)}, got {json.dumps(value)[:80]}")
+
+def schema_kind_name(kind):
+	if isinstance(kind, list):
+		return "list of " + kind[0].__name__
+	return kind
+
+# ----------------------------------------------------------------------
+##	Serialize an object as JSON text, for objects without nested object lists
+def schema_encode(obj, schema):
+	parts = []
+	for field in schema:
+		parts.append(f'"{field[0]}":{SCHEMA_ENCODERS[field[1]](getattr(obj, field[0]))}')
+	return '{' + ','.join(parts) + '}'
+
+# ----------------------------------------------------------------------
+##	Stream an object as JSON to a file, without an intermediate dict tree
+#	@param	outfile		Text file
+#	@param	obj			Object to write
+#	@param	schema		Its class SCHEMA
+def schema_dump(outfile, obj, schema):
+	separator = '{'
+	for field in schema:
+		name, kind = field[0], field[1]
+		value = getattr(obj, name)
+		if not isinstance(kind, list):
+			outfile.write(f'{separator}"{name}":{SCHEMA_ENCODERS[kind](value)}')
+			separator = ','
+			continue
+		outfile.write(f'{separator}"{name}":[')
+		separator = ','
+		item_schema = kind[0].SCHEMA
+		nested = any(isinstance(item[1], list) for item in item_schema)
+		item_separator = ''
+		for item in value:
+			outfile.write(item_separator)
+			if nested:
+				schema_dump(outfile, item, item_schema)
+			else:
+				outfile.write(schema_encode(item, item_schema))
+			item_separator = ','
+		outfile.write(']')
+	outfile.write('{}' if separator == '{' else '}')
+
+# ----------------------------------------------------------------------
+##	Scalar fields of an object, for formats that store its object lists their own way
+def schema_scalars(obj, schema):
+	return {field[0]: getattr(obj, field[0]) for field in schema if not isinstance(field[1], list)}
+
+# ----------------------------------------------------------------------
+##	Validate a decoded JSON object and set its fields on obj
+#	@param	obj		Object to fill
+#	@param	data	Decoded JSON object
+#	@param	schema	The class SCHEMA of obj
+#	@param	where	Location used in error messages
+#	@param	loaders	Optional dict of field name -> function(value, where) building an object list
+#					stored in another form, like the path columns of the compact format
+def schema_load(obj, data, schema, where, loaders=None):
+	if not isinstance(data, dict):
+		raise ValueError(f"{where}: expected an object, got {json.dumps(data)[:80]}")
+	for field in schema:
+		name, kind = field[0], field[1]
+		if name not in data:
+			if len(field) < 3:
+				raise ValueError(f"{where}: missing '{name}'")
+			default = field[2]
+			setattr(obj, name, list(default) if isinstance(default, list) else default)
+			continue
+		value = data[name]
+		schema_check(value, kind, f"{where}.{name}")
+		if loaders is not None and name in loaders:
+			value = loaders[name](value, f"{where}.{name}")
+		elif isinstance(kind, list):
+			cls = kind[0]
+			items = []
+			for idx, item in enumerate(value):
+				items.append(schema_load(cls(), item, cls.SCHEMA, f"{where}.{name}[{idx}]"))
+			value = items
+		setattr(obj, name, value)
+	return obj
+
+# ----------------------------------------------------------------------
+##	Digests of generated files, kept in a sidecar next to them
+#	A file whose size and mtime still match the sidecar is trusted without being read.
+class digest_cache:
+	"""Constructor"""
+	def __init__(self, in_dir):
+		self.dir = in_dir
+		self.filepath = os.path.join(in_dir, FILENAME_DIGEST_CACHE)
+		self.entries = {}	# file name -> [digest, size, mtime_ns]
+		self.dirty = False
+		try:
+			with open(self.filepath, 'r') as infile:
+				data = json.load(infile)
+			if isinstance(data, dict):
+				self.entries = data
+		except (OSError, ValueError):
+			pass
+
+	def _key(self, filepath):
+		return os.path.relpath(filepath, self.dir).replace(os.sep, '/')
+
+	def get_digest(self, filepath):
+		"""Digest of the file currently on disk, or None if it does not exist"""
+		try:
+			st = os.stat(filepath)
+		except OSError:
+			return None
+		entry = self.entries.get(self._key(filepath))
+		if entry is not None and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+			return entry[0]
+		with open(filepath, 'rb') as infile:
+			digest = hashlib.sha256(infile.read()).hexdigest()
+		self.set_digest(filepath, digest)
+		return digest
+
+	def set_digest(self, filepath, digest):
+		st = os.stat(filepath)
+		self.entries[self._key(filepath)] = [digest, st.st_size, st.st_mtime_ns]
+		self.dirty = True
+
+	def save(self):
+		if not self.dirty:
+			return
+		write_atomic(self.filepath, json.dumps(self.entries).encode('utf-8'))
+		self.dirty = False
+
+# ----------------------------------------------------------------------
+##	Create a temporary file next to a destination
+#	@return	(file descriptor, temporary path, permission bits for the destination)
+def make_temp_file(filepath):
+	dirname, basename = os.path.split(filepath)
+	try:
+		mode = os.stat(filepath).st_mode & 0o777
+	except OSError:
+		umask = os.umask(0)
+		os.umask(umask)
+		mode = 0o666 & ~umask
+	fd, temp = tempfile.mkstemp(prefix='.' + basename + '.', suffix='.tmp', dir=dirname or '.')
+	return fd, temp, mode
+
+# ----------------------------------------------------------------------
+##	Replace a file through a temporary file and a rename
+#	@param	filepath	Destination
+#	@param	data		Bytes to write
+def write_atomic(filepath, data):
+	fd, temp, mode = make_temp_file(filepath)
+	try:
+		with os.fdopen(fd, 'wb') as outfile:
+			outfile.write(data)
+		os.chmod(temp, mode)
+		os.replace(temp, filepath)
+	except BaseException:
+		os.unlink(temp)
+		raise
+
+# ----------------------------------------------------------------------
+##	Write a text file unless it already has the same content
+#	@param	filepath	Destination
+#	@param	text		New content
+#	@param	cache		digest_cache of the destination directory
+#	@return	True if the file was written
+def write_if_changed(filepath, text, cache):
+	data = text.encode('utf-8')
+	digest = hashlib.sha256(data).hexdigest()
+	if cache.get_digest(filepath) == digest:
+		return False
+	write_atomic(filepath, data)
+	cache.set_digest(filepath, digest)
+	return True
+
+# ----------------------------------------------------------------------
+##	Stream lines to a file unless it already has the same content
+#	The lines are hashed while they go through a buffered temporary file, which is
+#	renamed into place only if the digest differs, so the output is never held in memory.
+#	@param	filepath	Destination
+#	@param	lines		Iterable of lines without line endings
+#	@param	cache		digest_cache of the destination directory
+#	@return	True if the file was written
+def write_lines_if_changed(filepath, lines, cache):
+	h = hashlib.sha256()
+	fd, temp, mode = make_temp_file(filepath)
+	try:
+		with open(fd, 'wb', buffering=WRITE_BUFFER_SIZE) as outfile:
+			separator = b''
+			for line in lines:
+				data = separator + line.encode('utf-8')
+				h.update(data)
+				outfile.write(data)
+				separator = b'\n'
+		digest = h.hexdigest()
+		if cache.get_digest(filepath) == digest:
+			os.unlink(temp)
+			return False
+		os.chmod(temp, mode)
+		os.replace(temp, filepath)
+	except BaseException:
+		if os.path.exists(temp):
+			os.unlink(temp)
+		raise
+	cache.set_digest(filepath, digest)
+	return True
+
+# ----------------------------------------------------------------------
+##	Rules typed one per line, without blank lines and surrounding spaces
+def parse_rule_lines(text):
+	return [line.strip() for line in text.splitlines() if line.strip()]
+
+# ----------------------------------------------------------------------
+##	Translate a glob to a regular expression
+#	'**' matches any number of directories, '*', '?' and '[...]' stay inside one path segment.
+#	Character classes follow fnmatch: '[!...]' negates, and a '[' without its ']' is literal.
+#	@param	pattern		Glob relative to the solution root, '/' separated
+def glob_to_regex(pattern):
+	out = []
+	i = 0
+	n = len(pattern)
+	while i < n:
+		if pattern.startswith('**/', i):
+			out.append('(?:.*/)?')
+			i += 3
+		elif pattern.startswith('/**', i) and i + 3 == n:
+			out.append('(?:/.*)?')
+			i += 3
+		elif pattern.startswith('**', i):
+			out.append('.*')
+			i += 2
+		elif pattern[i] == '*':
+			out.append('[^/]*')
+			i += 1
+		elif pattern[i] == '?':
+			out.append('[^/]')
+			i += 1
+		elif pattern[i] == '[':
+			j = i + 1
+			if j < n and pattern[j] == '!':
+				j += 1
+			if j < n and pattern[j] == ']':
+				j += 1
+			j = pattern.find(']', j)
+			if j < 0:
+				out.append('\\[')
+				i += 1
+				continue
+			body = pattern[i + 1:j]
+			negate = body.startswith('!')
+			if negate:
+				body = body[1:]
+			body = ''.join(c if c == '-' else re.escape(c) for c in body)
+			out.append('[^/' + body + ']' if negate else '[' + body + ']')
+			i = j + 1
+		else:
+			out.append(re.escape(pattern[i]))
+			i += 1
+	return ''.join(out)
+
+# ----------------------------------------------------------------------
+##	Include/exclude glob rules
+#	"src/**/*.cpp" includes matching files, "!**/test/**" excludes them.
+class glob_rules:
+	"""Constructor"""
+	def __init__(self, rules):
+		includes = []
+		excludes = []
+		self.prefixes = []	# Literal leading directories of each include rule
+		self.depths = []	# Segment count of each include rule, None if it has '**'
+		for rule in rules:
+			rule = rule.strip().replace('\\', '/')
+			if not rule or rule.startswith('#'):
+				continue
+			if rule.startswith('!'):
+				excludes.append(glob_to_regex(rule[1:].lstrip('/')))
+				continue
+			rule = rule.lstrip('/')
+			includes.append(glob_to_regex(rule))
+			parts = rule.split('/')
+			self.depths.append(None if '**' in rule else len(parts))
+			prefix = []
+			for part in parts[:-1]:
+				if any(c in part for c in '*?['):
+					break
+				prefix.append(part)
+			self.prefixes.append(prefix)
+		self.include = re.compile('|'.join(includes)) if includes else None
+		self.exclude = re.compile('|'.join(excludes)) if excludes else None
+
+	def __bool__(self):
+		return self.include is not None
+
+	def match(self, relpath):
+		if self.include is None or not self.include.fullmatch(relpath):
+			return False
+		return self.exclude is None or not self.exclude.fullmatch(relpath)
+
+	def may_descend(self, reldir):
+		"""False if nothing below the directory can match"""
+		if self.exclude is not None and self.exclude.fullmatch(reldir):
+			return False
+		parts = reldir.split('/')
+		for prefix, depth in zip(self.prefixes, self.depths):
+			if depth is not None and len(parts) >= depth:
+				continue
+			n = min(len(prefix), len(parts))
+			if prefix[:n] == parts[:n]:
+				return True
+		return False
+
+# ----------------------------------------------------------------------
+##	Persistent index of a source tree
+#	Keeps each directory's mtime and entries (name, is_dir, mtime, size, inode) in
+#	CMakeConfig.index.json, so a rescan only lists directories whose mtime changed.
+class tree_index:
+	"""Constructor
+	@param	in_shared	Optional dict of absolute dir -> record shared between indexes of nested solutions
+	@param	in_skip		Directories relative to the root, '/' separated, never scanned, like solution.get_build_dirs()"""
+	def __init__(self, in_root, in_shared=None, in_skip=()):
+		self.root = in_root
+		self.root_abs = os.path.abspath(in_root)
+		self.shared = in_shared
+		self.skip = set(in_skip)
+		self.filepath = os.path.join(in_root, FILENAME_INDEX)
+		self.dirs = {}		# relative dir -> [mtime_ns, [[name, is_dir, mtime_ns, size, inode], ...]]
+		self.dirty = False
+		try:
+			with open(self.filepath, 'r') as infile:
+				data = json.load(infile)
+			if isinstance(data, dict) and isinstance(data.get('dirs'), dict):
+				self.dirs = data['dirs']
+		except (OSError, ValueError):
+			pass
+
+	def save(self):
+		if not self.dirty:
+			return
+		write_atomic(self.filepath, json.dumps({'dirs': self.dirs}, separators=(',', ':')).encode('utf-8'))
+		self.dirty = False
+
+	def _read_dir(self, reldir):
+		"""Runs on a worker thread; returns the cached record if the directory is unchanged"""
+		absdir = os.path.join(self.root, reldir) if reldir else self.root
+		try:
+			st = os.stat(absdir)
+		except OSError:
+			return reldir, None, False
+		cached = self.dirs.get(reldir)
+		if cached is not None and cached[0] == st.st_mtime_ns:
+			return reldir, cached, False
+		if self.shared is not None:
+			cached = self.shared.get(self._shared_key(reldir))
+			if cached is not None and cached[0] == st.st_mtime_ns:
+				return reldir, cached, True
+		entries = []
+		try:
+			with os.scandir(absdir) as it:
+				for entry in it:
+					try:
+						est = entry.stat(follow_symlinks=False)
+					except OSError:
+						continue
+					entries.append([entry.name, stat.S_ISDIR(est.st_mode), est.st_mtime_ns, est.st_size, est.st_ino])
+		except OSError:
+			return reldir, None, False
+		entries.sort()
+		mtime = st.st_mtime_ns
+		if time.time_ns() - mtime < SCAN_RACY_NS:
+			mtime = -1
+		return reldir, [mtime, entries], True
+
+	def _shared_key(self, reldir):
+		return os.path.normpath(os.path.join(self.root_abs, reldir))
+
+	def _forget(self, reldir):
+		prefix = reldir + '/'
+		for key in [key for key in self.dirs if key == reldir or key.startswith(prefix)]:
+			del self.dirs[key]
+		self.dirty = True
+
+	def _store(self, reldir, record):
+		old = self.dirs.get(reldir)
+		if old is not None:
+			kept = set(entry[0] for entry in record[1] if entry[1])
+			for entry in old[1]:
+				if entry[1] and entry[0] not in kept:
+					self._forget(reldir + '/' + entry[0] if reldir else entry[0])
+		self.dirs[reldir] = record
+		self.dirty = True
+
+	def scan(self, file_rules, dir_rules=None):
+		"""Walk the tree in parallel
+		@param	file_rules	glob_rules selecting files
+		@param	dir_rules	glob_rules selecting directories
+		@return	Sorted arrays of matching files and directories, relative to root"""
+		with profile_phase("scan"):
+			return self._scan(file_rules, dir_rules)
+
+	def _scan(self, file_rules, dir_rules):
+		files = []
+		dirs = []
+		rules = [r for r in (file_rules, dir_rules) if r]
+		if not rules:
+			return files, dirs
+		build_trees = set()
+		with concurrent.futures.ThreadPoolExecutor(SCAN_WORKERS) as pool:
+			pending = {pool.submit(self._read_dir, '')}
+			while pending:
+				done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					reldir, record, changed = future.result()
+					if record is None:
+						self._forget(reldir)
+						continue
+					if changed:
+						self._store(reldir, record)
+					if self.shared is not None:
+						self.shared[self._shared_key(reldir)] = record
+					# A CMake build tree holds generated sources, like the compiler checks
+					if reldir and any(entry[0] == FILENAME_CMAKE_CACHE and not entry[1] for entry in record[1]):
+						build_trees.add(reldir)
+						continue
+					for entry in record[1]:
+						relpath = reldir + '/' + entry[0] if reldir else entry[0]
+						if entry[1]:
+							# Hidden directories like .git and DIRNAME_GENERATED are never scanned, as in the watchers
+							if entry[0].startswith('.') or entry[0] == DIRNAME_CMAKE_FILES or relpath in self.skip:
+								continue
+							if dir_rules and dir_rules.match(relpath):
+								dirs.append(relpath)
+							if any(r.may_descend(relpath) for r in rules):
+								pending.add(pool.submit(self._read_dir, relpath))
+						elif file_rules and file_rules.match(relpath):
+							files.append(relpath)
+		if build_trees:
+			dirs = [reldir for reldir in dirs if reldir not in build_trees]
+		files.sort()
+		dirs.sort()
+		return files, dirs
+
+# ----------------------------------------------------------------------
+##	#include directives of a file; runs in worker processes
+#	@return	Array of [quoted, name, conditional]: quoted is True for "name" and False for <name>,
+#			conditional is True inside #if, #ifdef or #ifndef
+def parse_includes(filepath):
+	try:
+		with open(filepath, 'rb') as infile:
+			data = infile.read()
+	except OSError:
+		return []
+	out = []
+	depth = 0
+	for directive, kind, name in RE_DIRECTIVE.findall(data):
+		if directive == b'include':
+			if name:
+				out.append([kind == b'"', name.decode('utf-8', 'replace').strip(), depth > 0])
+		elif directive == b'endif':
+			depth = max(0, depth - 1)
+		else:
+			depth += 1
+	return out
+
+# ----------------------------------------------------------------------
+##	Include directives of a source tree, cached in .cmakegen_includes.json
+#	A file is parsed again only when its mtime or size changed.
+class include_scanner:
+	"""Constructor"""
+	def __init__(self, in_dir, jobs=None):
+		self.filepath = os.path.join(in_dir, FILENAME_INCLUDE_CACHE) if in_dir else None
+		self.files = {}		# Absolute path -> [mtime_ns, size, includes]
+		self.dirty = False
+		self.jobs = jobs	# Worker processes, None for the CPU count
+		self.parsed = 0
+		self.cached = 0
+		self.exists = {}	# Absolute path -> bool, for the current scan
+		if self.filepath is None:
+			return
+		try:
+			with open(self.filepath, 'r') as infile:
+				data = json.load(infile)
+			if isinstance(data, dict) and data.get('version') == INCLUDE_CACHE_VERSION:
+				self.files = data['files']
+		except (OSError, ValueError, KeyError):
+			pass
+
+	def save(self):
+		if not self.dirty or self.filepath is None:
+			return
+		data = {'version': INCLUDE_CACHE_VERSION, 'files': self.files}
+		write_atomic(self.filepath, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+		self.dirty = False
+
+	def includes(self, filepaths):
+		"""Include directives of many files, in worker processes when many changed
+		@return	Dict of path -> includes, without the files that do not exist"""
 		out = {}
-		for key, val in temp.items():
-			out[key] = to_dict(val)
+		stale = []
+		for filepath in filepaths:
+			try:
+				st = os.stat(filepath)
+			except OSError:
+				continue
+			cached = self.files.get(filepath)
+			if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+				out[filepath] = cached[2]
+			else:
+				stale.append((filepath, st))
+		self.cached += len(out)
+		if not stale:
+			return out
+		paths = [filepath for filepath, st in stale]
+		if len(stale) >= INCLUDE_PARSE_PARALLEL and self.jobs != 1:
+			with concurrent.futures.ProcessPoolExecutor(self.jobs) as pool:
+				parsed = list(pool.map(parse_includes, paths, chunksize=64))
+		else:
+			parsed = [parse_includes(filepath) for filepath in paths]
+		for (filepath, st), includes in zip(stale, parsed):
+			self.files[filepath] = [st.st_mtime_ns, st.st_size, includes]
+			out[filepath] = includes
+		self.parsed += len(stale)
+		self.dirty = True
 		return out
-	else:
-		return obj
+
+	def _isfile(self, filepath):
+		found = self.exists.get(filepath)
+		if found is None:
+			found = self.exists[filepath] = os.path.isfile(filepath)
+		return found
+
+	def resolve(self, sources, include_dirs):
+		"""Follow the includes of sources through every header they reach
+		@param	sources			Array of absolute source paths
+		@param	include_dirs	Array of absolute include directories, in search order
+		@return	(hits, unresolved): the number of includes first found in each directory,
+				and the number of times each name could not be found"""
+		self.exists = {}
+		hits = dict.fromkeys(include_dirs, 0)
+		unresolved = {}
+		searched = {}		# Name -> (directory, path) found through include_dirs
+		seen = set(sources)
+		wave = list(seen)
+		while wave:
+			parsed = self.includes(wave)
+			wave = []
+			for filepath, includes in parsed.items():
+				for quoted, name, conditional in includes:
+					found = None
+					if quoted:
+						candidate = os.path.normpath(os.path.join(os.path.dirname(filepath), name))
+						if self._isfile(candidate):
+							found = candidate
+					if found is None:
+						if name not in searched:
+							searched[name] = (None, None)
+							for dirname in include_dirs:
+								candidate = os.path.normpath(os.path.join(dirname, name))
+								if self._isfile(candidate):
+									searched[name] = (dirname, candidate)
+									break
+						dirname, found = searched[name]
+						if dirname is not None:
+							hits[dirname] += 1
+					if found is None:
+						unresolved[name] = unresolved.get(name, 0) + 1
+					elif found not in seen:
+						seen.add(found)
+						wave.append(found)
+		return hits, unresolved
+
+# ----------------------------------------------------------------------
+##	Bitmask of platform names over SUPPORT_PLATFORMS
+def platform_mask(names):
+	mask = 0
+	for name in names:
+		mask |= PLATFORM_BITS.get(name, 0)
+	return mask
 
 # ----------------------------------------------------------------------
+##	Platform names of a bitmask, in SUPPORT_PLATFORMS order
+def platform_names(mask):
+	names = PLATFORM_NAMES.get(mask)
+	if names is None:
+		names = tuple(name for name in SUPPORT_PLATFORMS if mask & PLATFORM_BITS[name])
+		PLATFORM_NAMES[mask] = names
+	return names
+
+# ----------------------------------------------------------------------
+##	CMake if() condition that holds on the platforms of a bitmask
+def platform_condition(mask):
+	conditions = [PLATFORM_CMAKE_CONDITIONS[name] for name in platform_names(mask)]
+	if len(conditions) == 1:
+		return conditions[0]
+	return " OR ".join(f"({cond})" if " " in cond else cond for cond in conditions)
+
+# ----------------------------------------------------------------------
+##	Split entries by the platforms they share with a project
+#	@param	pathlist	Array of path_info
+#	@param	mask		Platform bitmask of the project
+#	@return	(entries on every platform of mask, [(bitmask, entries), ...] ordered by bitmask);
+#			entries on none of them are left out
+def group_by_platform(pathlist, mask):
+	common = []
+	groups = {}
+	for info in pathlist:
+		shared = info.platform_mask & mask
+		if not shared or not info.path:
+			continue
+		if shared == mask:
+			common.append(info)
+		else:
+			groups.setdefault(shared, []).append(info)
+	return common, sorted(groups.items())
+
+# ----------------------------------------------------------------------
+##	CMakePresets.json condition that holds on the hosts of a bitmask
+#	Linux stands for every other UNIX, as in PLATFORM_CMAKE_CONDITIONS, so it excludes the others instead.
+#	@return	Condition object, or None on every platform
+def preset_condition(mask):
+	if mask == PLATFORM_ALL:
+		return None
+	if mask & PLATFORM_BITS["Linux"]:
+		excluded = [PLATFORM_HOST_NAMES[name] for name in SUPPORT_PLATFORMS if not mask & PLATFORM_BITS[name]]
+		return {'type': "notInList", 'string': "${hostSystemName}", 'list': excluded}
+	return {'type': "inList", 'string': "${hostSystemName}", 'list': [PLATFORM_HOST_NAMES[name] for name in platform_names(mask)]}
+
+# ----------------------------------------------------------------------
+##	Compiler launcher program for a solution.compiler_launcher setting
+#	@return	Program name, or None when no launcher is used
+def find_compiler_launcher(setting):
+	if setting == LAUNCHER_NONE:
+		return None
+	if setting == LAUNCHER_AUTO:
+		for name in LAUNCHER_PROGRAMS:
+			if shutil.which(name):
+				return name
+		return None
+	return setting
+
+# ----------------------------------------------------------------------
+##	Whether a CMakePresets.json may be overwritten: missing, or written by this generator
+def is_generated_presets(filepath):
+	try:
+		with open(filepath, 'r') as infile:
+			data = json.load(infile)
+	except FileNotFoundError:
+		return True
+	except (OSError, ValueError):
+		return False
+	return isinstance(data, dict) and PRESET_VENDOR in (data.get('vendor') or {})
+
+# ----------------------------------------------------------------------
+##	Whether a CMakeLists.txt may be overwritten: missing, or starting with CMAKE_GENERATED_MARKER
+def is_generated_cmake(filepath):
+	try:
+		with open(filepath, 'r', encoding='utf-8', errors='replace') as infile:
+			first = infile.readline()
+	except FileNotFoundError:
+		return True
+	except OSError:
+		return False
+	return first.rstrip('\r\n') == CMAKE_GENERATED_MARKER
+
+# ----------------------------------------------------------------------
+##	Yield one if() block per platform group from group_by_platform()
+#	@param	target	CMake target name
+#	@param	command	Command adding the entries to the target, like target_sources
+#	@param	groups	Array of (bitmask, entries); an entry is a path_info or a CMake path
+def iter_cmake_platform_groups(target, command, groups, prefix=""):
+	for mask, entries in groups:
+		yield f"if({platform_condition(mask)})"
+		yield f"    {command}({target} PRIVATE"
+		for info in entries:
+			yield f"        {info if isinstance(info, str) else info.get_cmake_path(prefix)}"
+		yield "    )"
+		yield "endif()"
+		yield ""
+
+# ----------------------------------------------------------------------
+##	Root directory shared by every path of a solution
+#	Moving the solution only changes this object; paths are rebased when next rendered.
+class path_root:
+	__slots__ = ('_path', 'rel_dirs')
+
+	"""Constructor"""
+	def __init__(self, in_path=None):
+		self.path = in_path
+
+	@property
+	def path(self):
+		return self._path
+
+	@path.setter
+	def path(self, value):
+		self._path = sys.intern(value) if value is not None else None
+		self.rel_dirs = {}	# Absolute directory -> directory relative to path, or None across drives
+
+	def relpath(self, absolute):
+		"""os.path.relpath() against this root, memoized per directory"""
+		absolute = os.path.normpath(absolute)
+		dirname, name = os.path.split(absolute)
+		if name in ('', '.', '..') or (self._path + os.sep).startswith(absolute + os.sep):
+			return os.path.relpath(absolute, self._path)
+		if dirname in self.rel_dirs:
+			reldir = self.rel_dirs[dirname]
+		else:
+			reldir = None
+			if os.path.splitdrive(dirname)[0] == os.path.splitdrive(self._path)[0]:
+				reldir = os.path.relpath(dirname, self._path)
+			self.rel_dirs[dirname] = reldir
+		if reldir is None:
+			return None
+		return name if reldir == '.' else os.path.join(reldir, name)
+
+# ----------------------------------------------------------------------
+##	Path with its platforms
+#	Entries are compact: no __dict__, platforms are a bitmask over SUPPORT_PLATFORMS
+#	and equal base paths share one interned string.
+#	The path is stored once as given (absolute, or relative to base_path). type, base_path
+#	and path read it as seen from the shared path_root; that view is memoized per root.
 class path_info:
+	__slots__ = ('_type', '_base_path', '_path', 'platform_mask', 'root', '_view', '_view_root')
+
+	SCHEMA = [
+		('type', FIELD_INT),
+		('base_path', FIELD_OPTIONAL_STR),
+		('path', FIELD_OPTIONAL_STR),
+		('platform', FIELD_STR_LIST),
+	]
+
 	"""Constructor"""
 	def __init__(self, in_path = None, in_base=None):
+		self.root = None
+		self._view = None
+		self._view_root = None
+		if isinstance(in_base, path_root):
+			self.root = in_base
+			in_base = in_base.path
 		if in_path is not None:
 			self.type = PATHINFO_TYPE_ABSOLUTE
 			self.base_path = None
@@ -102,107 +1095,693 @@ class path_info:
 			self.type = PATHINFO_TYPE_NONE
 			self.base_path = None
 			self.path = None
-		self.platform = []
+		self.platform_mask = 0
+
+	def view(self):
+		"""(type, base path, path) relative to the current root when possible"""
+		root = self.root.path if self.root is not None else None
+		if root is None or self._type == PATHINFO_TYPE_NONE or self._type == PATHINFO_TYPE_ENV:
+			return self._type, self._base_path, self._path
+		if self._type == PATHINFO_TYPE_RELATIVE and self._base_path == root:
+			return self._type, self._base_path, self._path
+		if self._view_root is root:
+			return self._view
+		if self._type == PATHINFO_TYPE_RELATIVE:
+			absolute = os.path.join(self._base_path, self._path)
+		else:
+			absolute = self._path
+		relative = self.root.relpath(absolute)
+		if relative is not None:
+			self._view = (PATHINFO_TYPE_RELATIVE, root, relative)
+		else:
+			self._view = (PATHINFO_TYPE_ABSOLUTE, None, absolute)
+		self._view_root = root
+		return self._view
+
+	@property
+	def type(self):
+		return self.view()[0]
+
+	@type.setter
+	def type(self, value):
+		self._type = value
+		self._view_root = None
+
+	@property
+	def base_path(self):
+		return self.view()[1]
+
+	@base_path.setter
+	def base_path(self, value):
+		self._base_path = sys.intern(value) if value is not None else None
+		self._view_root = None
+
+	@property
+	def path(self):
+		return self.view()[2]
+
+	@path.setter
+	def path(self, value):
+		self._path = value
+		self._view_root = None
+
+	def attach(self, root):
+		"""Share a solution root; stored relative paths are taken as relative to it"""
+		self.root = root
+		if self._type == PATHINFO_TYPE_RELATIVE:
+			self._base_path = root.path
+		self._view_root = None
+
+	@property
+	def platform(self):
+		"""Platform names as a tuple, so it cannot be changed in place; assign it or use set_platform()"""
+		return platform_names(self.platform_mask)
+
+	@platform.setter
+	def platform(self, names):
+		self.platform_mask = platform_mask(names)
+
+	def has_platform(self, platname):
+		return bool(self.platform_mask & PLATFORM_BITS.get(platname, 0))
 
 	def change_base_path(self, new_path):
-		if self.type == PATHINFO_TYPE_RELATIVE:
-			self.path = os.path.join(self.base_path, self.path)
+		"""Rebase the stored path right away"""
+		if self._type == PATHINFO_TYPE_RELATIVE:
+			self.path = os.path.join(self._base_path, self._path)
 			self.type = PATHINFO_TYPE_ABSOLUTE
 			self.base_path = None
-		if self.type == PATHINFO_TYPE_ABSOLUTE and new_path is not None:
-			own_drive, own_path = os.path.splitdrive(self.path)
+		if self._type == PATHINFO_TYPE_ABSOLUTE and new_path is not None:
+			own_drive, own_path = os.path.splitdrive(self._path)
 			chg_drive, chg_path = os.path.splitdrive(new_path)
 			if own_drive == chg_drive:		
 				self.type = PATHINFO_TYPE_RELATIVE
 				self.base_path = new_path
-				self.path = os.path.relpath(self.path, new_path)
+				self.path = os.path.relpath(self._path, new_path)
+
+	def get_absolute(self):
+		"""Normalized absolute path, or the stored path if it cannot be made absolute"""
+		if self._type == PATHINFO_TYPE_RELATIVE and self._base_path is not None:
+			return os.path.normpath(os.path.join(self._base_path, self._path))
+		if self._type == PATHINFO_TYPE_ABSOLUTE:
+			return os.path.normpath(self._path)
+		return self._path
+
+	def get_cmake_path(self, prefix=""):
+		"""Path as written to CMakeLists.txt"""
+		kind, base, path = self.view()
+		if kind == PATHINFO_TYPE_RELATIVE:
+			return prefix + path
+		return path
 
 	def set_platform(self, platname, enable):
 		if enable:
-			if platname not in self.platform:
-				self.platform.append(platname)
+			self.platform_mask |= PLATFORM_BITS.get(platname, 0)
 		else:
-			if platname in self.platform:
-				self.platform.remove(platname)
+			self.platform_mask &= ~PLATFORM_BITS.get(platname, 0)
 
 	@staticmethod
-	def fromdict(s):
+	def fromdict(s, where="path_info"):
 		if isinstance(s, list):
 			out = []
-			for elem in s:
-				out.append(path_info.fromdict(elem))
+			for idx, elem in enumerate(s):
+				out.append(path_info.fromdict(elem, f"{where}[{idx}]"))
 			return out
 		else:
-			out = path_info()
-			out.type = s['type']
-			out.base_path = s['base_path']
-			out.path = s['path']
-			out.platform = s['platform']
-			return out
+			return schema_load(path_info(), s, path_info.SCHEMA, where)
+
+	@staticmethod
+	def tocolumns(pathlist, table):
+		"""Columnar form of a path list: [types, base ids, path ids, platform masks]"""
+		types = []
+		bases = []
+		paths = []
+		masks = []
+		for info in pathlist:
+			types.append(info.type)
+			bases.append(table.add(info.base_path))
+			paths.append(table.add(info.path))
+			masks.append(info.platform_mask)
+		return [types, bases, paths, masks]
+
+	@staticmethod
+	def fromcolumns(columns, strings, platforms, where="columns"):
+		"""Rebuild a path list from tocolumns() output without per-entry dicts
+		@param	strings		String table; ids index it, -1 is None
+		@param	platforms	Platform names in the bit order of the masks
+		@param	where		Location used in error messages"""
+		if len(columns) != 4 or not all(isinstance(column, list) for column in columns):
+			raise ValueError(f"{where}: expected 4 path columns")
+		types, bases, paths, masks = columns
+		if not (len(types) == len(bases) == len(paths) == len(masks)):
+			raise ValueError(f"{where}: path columns have different lengths")
+		remap = None
+		if list(platforms) != SUPPORT_PLATFORMS:
+			remap = {}
+		out = []
+		for kind, base, path, mask in zip(types, bases, paths, masks):
+			if remap is not None:
+				if mask not in remap:
+					remap[mask] = platform_mask(platforms[i] for i in range(len(platforms)) if mask & (1 << i))
+				mask = remap[mask]
+			info = path_info.__new__(path_info)
+			info._type = kind
+			info._base_path = strings[base] if base >= 0 else None
+			info._path = strings[path] if path >= 0 else None
+			info.platform_mask = mask
+			info.root = None
+			info._view = None
+			info._view_root = None
+			out.append(info)
+		return out
+
+# ----------------------------------------------------------------------
+##	Table of unique strings referenced by index
+class string_table:
+	"""Constructor"""
+	def __init__(self):
+		self.strings = []
+		self.ids = {}
+
+	def add(self, text):
+		if text is None:
+			return -1
+		idx = self.ids.get(text)
+		if idx is None:
+			idx = len(self.strings)
+			self.ids[text] = idx
+			self.strings.append(text)
+		return idx
+
+# ----------------------------------------------------------------------
+##	Split sources into unity batches
+#	Sources are ordered by directory, then name, and a batch never spans two directories,
+#	so adding or removing a source only changes the batches of its own directory.
+#	@param	paths		Array of absolute source paths
+#	@param	batch_size	Maximum number of sources per batch
+#	@param	batch_bytes	Maximum total size of the sources of a batch, 0 for no limit
+#	@return	Array of (directory, array of batches), a batch being an array of paths
+def unity_batches(paths, batch_size, batch_bytes=0):
+	out = []
+	total = 0
+	for path in sorted(paths, key=os.path.split):
+		dirname = os.path.dirname(path)
+		if not out or out[-1][0] != dirname:
+			out.append((dirname, [[]]))
+			total = 0
+		batches = out[-1][1]
+		size = 0
+		if batch_bytes:
+			try:
+				size = os.stat(path).st_size
+			except OSError:
+				pass
+		if batches[-1] and (len(batches[-1]) >= batch_size or (batch_bytes and total + size > batch_bytes)):
+			batches.append([])
+			total = 0
+		batches[-1].append(path)
+		total += size
+	return out
+
+# ----------------------------------------------------------------------
+##	Part of a unity batch file name naming a source directory
+#	Long names, and names another directory already took, get a digest of the directory,
+#	so two directories never share batch files.
+#	@param	reldir	Directory relative to the solution root, '/' separated
+#	@param	used	Dict of name -> directory, filled as names are given out
+def unity_dir_name(reldir, used):
+	name = re.sub(r'[^A-Za-z0-9]+', '_', reldir).strip('_') or "root"
+	if len(name) > UNITY_DIR_NAME_MAX or used.get(name, reldir) != reldir:
+		name = name[:UNITY_DIR_NAME_MAX] + "_" + hashlib.sha1(reldir.encode('utf-8')).hexdigest()[:8]
+	used[name] = reldir
+	return name
+
+# ----------------------------------------------------------------------
+##	Sources generated while emitting CMakeLists.txt: unity batch files and PCH headers
+class generated_files:
+	"""Constructor"""
+	def __init__(self, in_root):
+		self.root = in_root		# Solution directory
+		self.files = []			# Array of (file path, line generator)
+		self.scanner = None		# include_scanner shared by the projects, see get_scanner()
+		self.discovered = {}	# id(project) -> (sources, include_dirs) from project.discover()
+		self.shared_libs = []	# OBJECT libraries of sources shared by projects, see solution.share_sources()
+		self.moved = {}			# id(project) -> (canonical paths moved to libraries, library names)
+		self.linker = LINKER_DEFAULT	# solution.linker, passed to every project
+		self.masks = {}			# id(project) -> platforms its target exists on, 0 for none
+
+	def get_scanner(self):
+		if self.scanner is None:
+			self.scanner = include_scanner(self.root)
+		return self.scanner
+
+	def save(self):
+		if self.scanner is not None:
+			self.scanner.save()
+
+	def add(self, proj_name, filename, lines, prefix=""):
+		"""Add a file to write under the project's directory
+		@return	Path of the file as written to CMakeLists.txt"""
+		if self.root is not None:
+			self.files.append((os.path.join(self.root, DIRNAME_GENERATED, proj_name, filename), lines))
+		return f"{prefix}{DIRNAME_GENERATED}/{proj_name}/{filename}"
+
+	def add_unity(self, proj_name, filename, paths, prefix=""):
+		"""Add a unity batch file including paths"""
+		dirname = os.path.join(self.root or "", DIRNAME_GENERATED, proj_name)
+		return self.add(proj_name, filename, generated_files._iter_unity(dirname, paths), prefix)
+
+	def add_pch(self, proj_name, includes, prefix=""):
+		"""Add a precompiled header including names, spelled <name>"""
+		return self.add(proj_name, FILENAME_PCH, generated_files._iter_pch(includes), prefix)
+
+	@staticmethod
+	def _iter_unity(dirname, paths):
+		yield "// Generated by cmakegen, do not edit"
+		for path in paths:
+			try:
+				path = os.path.relpath(path, dirname)
+			except ValueError:
+				pass	# Another drive
+			yield f'#include "{path.replace(os.sep, "/")}"'
+		yield ""
+
+	@staticmethod
+	def _iter_pch(includes):
+		yield "// Generated by cmakegen, do not edit"
+		yield "#pragma once"
+		for name in includes:
+			yield f"#include <{name}>"
+		yield ""
+
+	def remove_stale(self, keep):
+		"""Delete files left from previous generations
+		@param	keep	Set of file paths to keep"""
+		topdir = os.path.join(self.root, DIRNAME_GENERATED)
+		if not os.path.isdir(topdir):
+			return
+		for name in os.listdir(topdir):
+			dirname = os.path.join(topdir, name)
+			if not os.path.isdir(dirname):
+				continue
+			for filename in os.listdir(dirname):
+				filepath = os.path.join(dirname, filename)
+				if (filename.startswith("unity_") or filename == FILENAME_PCH) and filepath not in keep:
+					os.remove(filepath)
+			if not os.listdir(dirname):
+				os.rmdir(dirname)
+		if not os.listdir(topdir):
+			os.rmdir(topdir)
 
 # ----------------------------------------------------------------------
 class project:
+	SCHEMA = [
+		('name', FIELD_STR),
+		('include_dirs', [path_info]),
+		('library_dirs', [path_info]),
+		('sources', [path_info]),
+		('source_rules', FIELD_STR_LIST, []),
+		('include_rules', FIELD_STR_LIST, []),
+		('platform', FIELD_STR_LIST),
+		('stdcpp', FIELD_STR),
+		('target_type', FIELD_STR, PROJECT_EXECUTABLE),
+		('unity', FIELD_STR, UNITY_OFF),
+		('unity_batch_size', FIELD_INT, UNITY_BATCH_SIZE),
+		('unity_batch_bytes', FIELD_INT, 0),
+		('unity_exclude', FIELD_STR_LIST, []),
+		('pch_threshold', FIELD_INT, 0),
+		('pch_max_headers', FIELD_INT, PCH_MAX_HEADERS),
+		('pch_exclude', FIELD_STR_LIST, []),
+	]
+
 	"""Constructor"""
 	def __init__(self):
 		self.name = "Project1"  # Set default name
 		self.include_dirs = []	# Array of path_info
 		self.library_dirs = []
 		self.sources = []
+		self.source_rules = []	# Globs expanded into sources at generation time
+		self.include_rules = []	# Globs of directories added to include_dirs at generation time
 		self.platform = ["Windows"]  # Default to Windows platform
 		self.stdcpp = CXXSTANDARD[0]
+		self.target_type = PROJECT_EXECUTABLE	# One of PROJECT_TYPES
+		self.unity = UNITY_OFF		# One of UNITY_MODES
+		self.unity_batch_size = UNITY_BATCH_SIZE	# Sources per batch
+		self.unity_batch_bytes = 0	# Total source size per batch with UNITY_FILES, 0 for no limit
+		self.unity_exclude = []		# Globs of sources kept out of unity batches
+		self.pch_threshold = 0		# Percent of the sources that must include a header to precompile it, 0 for no PCH
+		self.pch_max_headers = PCH_MAX_HEADERS
+		self.pch_exclude = []		# Globs of include names never precompiled
 
 	def enable_platform(self, name, enable):
 		if enable:
 			if name not in self.platform:
 				self.platform.append(name)
-			self.add_plaform(name, self.include_dirs)
-			self.add_plaform(name, self.library_dirs)
-			self.add_plaform(name, self.sources)
 		else:
 			if name in self.platform:
 				idx = self.platform.index(name)
 				del self.platform[idx]
-			self.del_plaform(name, self.include_dirs)
-			self.del_plaform(name, self.library_dirs)
-			self.del_plaform(name, self.sources)
+		self.set_platform_bulk(name, enable)
 
 	def add_plaform(self, name, pathlist):
-		for info in pathlist:
-			if name not in info.platform:
-				info.platform.append(name)
+		self.set_platform_bulk(name, True, [pathlist])
 
 	def del_plaform(self, name, pathlist):
-		for info in pathlist:
-			if name in info.platform:
-				info.platform.remove(name)
-
-	def change_base_path(self, old_path, new_path):
-		self._change_base_path(self.include_dirs, old_path, new_path)
-		self._change_base_path(self.library_dirs, old_path, new_path)
-		self._change_base_path(self.sources, old_path, new_path)
+		self.set_platform_bulk(name, False, [pathlist])
+
+	def set_platform_bulk(self, name, enable, pathlists=None, pattern=None):
+		"""Enable or disable a platform on many entries in a single pass
+		@param	name		Platform name
+		@param	enable		True to enable
+		@param	pathlists	Lists to change; include, library and source lists by default
+		@param	pattern		Optional glob, e.g. "src/win32/**"; only matching paths change
+		@return	Number of entries whose platforms changed"""
+		if pathlists is None:
+			pathlists = [self.include_dirs, self.library_dirs, self.sources]
+		bit = PLATFORM_BITS.get(name, 0)
+		rules = glob_rules([pattern]) if pattern else None
+		changed = 0
+		for pathlist in pathlists:
+			if rules is None:
+				# Whole list: count what will change, then flip every mask
+				if enable:
+					changed += sum(1 for info in pathlist if not info.platform_mask & bit)
+					for info in pathlist:
+						info.platform_mask |= bit
+				else:
+					changed += sum(1 for info in pathlist if info.platform_mask & bit)
+					for info in pathlist:
+						info.platform_mask &= ~bit
+				continue
+			for info in pathlist:
+				if not info.path or not rules.match(info.path.replace('\\', '/')):
+					continue
+				mask = info.platform_mask | bit if enable else info.platform_mask & ~bit
+				if mask != info.platform_mask:
+					info.platform_mask = mask
+					changed += 1
+		return changed
+
+	def _discovered(self, index, listed, found):
+		known = set()
+		for info in listed:
+			if info.path:
+				known.add(info.path.replace('\\', '/'))
+		out = list(listed)
+		mask = platform_mask(self.platform)
+		for relpath in found:
+			if relpath not in known:
+				info = path_info()
+				info.type = PATHINFO_TYPE_RELATIVE
+				info.base_path = index.root
+				info.path = relpath
+				info.platform_mask = mask
+				out.append(info)
+		return out
 
-	def _change_base_path(self, pathlist, old_path, new_path):
-		for info in pathlist:
-			info.change_base_path(new_path)
+	def discover(self, index):
+		"""Listed sources and include directories, followed by the ones found by the rules
+		@param	index	tree_index of the solution root, or None
+		@return	(sources, include_dirs)"""
+		if index is None or not (self.source_rules or self.include_rules):
+			return self.sources, self.include_dirs
+		files, dirs = index.scan(glob_rules(self.source_rules), glob_rules(self.include_rules))
+		return self._discovered(index, self.sources, files), self._discovered(index, self.include_dirs, dirs)
 
 	@staticmethod
-	def fromdict(s):
-		out = project()
-		out.name = s['name']
-		out.include_dirs = path_info.fromdict(s['include_dirs'])
-		out.library_dirs = path_info.fromdict(s['library_dirs'])
-		out.sources = path_info.fromdict(s['sources'])
-		out.platform = s['platform']
-		out.stdcpp = s['stdcpp']
+	def fromdict(s, where="project"):
+		return schema_load(project(), s, project.SCHEMA, where)
+
+	def tocompact(self, table):
+		"""Fields of SCHEMA, with the path lists as tocolumns() output"""
+		out = schema_scalars(self, project.SCHEMA)
+		for field in project.SCHEMA:
+			if field[1] == [path_info]:
+				out[field[0]] = path_info.tocolumns(getattr(self, field[0]), table)
 		return out
 
+	@staticmethod
+	def fromcompact(s, strings, platforms, where="project"):
+		def load_columns(columns, where):
+			return path_info.fromcolumns(columns, strings, platforms, where)
+		loaders = {field[0]: load_columns for field in project.SCHEMA if field[1] == [path_info]}
+		return schema_load(project(), s, project.SCHEMA, where, loaders)
+
+	def iter_cmake_content(self, index=None, prefix="", generated=None):
+		"""Yield the lines describing this project
+		@param	index	tree_index used by the source and include rules
+		@param	prefix	Prepended to relative paths, for files outside the solution root
+		@param	generated	generated_files receiving unity batch files and PCH headers"""
+		if self.target_type not in PROJECT_TYPES:
+			raise ValueError(f"{self.name}: unknown project type '{self.target_type}', expected one of {', '.join(PROJECT_TYPES)}")
+		if self.unity not in UNITY_MODES:
+			raise ValueError(f"{self.name}: unknown unity mode '{self.unity}', expected one of {', '.join(UNITY_MODES)}")
+		if generated is None:
+			generated = generated_files(None)
+		found = generated.discovered.get(id(self))
+		sources, include_dirs = found if found is not None else self.discover(index)
+		profile_count(self.name, sources=len(sources), listed_sources=len(self.sources),
+			include_dirs=len(include_dirs), library_dirs=len(self.library_dirs))
+		yield f"# Project: {self.name}"
+		mask = platform_mask(self.platform)
+		
+		# A platform without any source would leave the target empty there
+		built = 0
+		for source in sources:
+			built |= source.platform_mask
+		if built & mask:
+			mask &= built
+		generated.masks[id(self)] = mask
+		if not mask:
+			yield "# No platform enabled"
+			yield ""
+			return
+		
+		# Sources shared with other projects are compiled once, in OBJECT libraries
+		moved, libraries = generated.moved.get(id(self), ((), ()))
+		if moved:
+			sources = [info for info in sources if not info.path or os.path.normcase(info.get_absolute()) not in moved]
+		
+		# The whole target only exists on the platforms of the project
+		if mask != PLATFORM_ALL:
+			yield f"if({platform_condition(mask)})"
+		
+		# Add executable with the sources built on every platform of the project,
+		# then the platform specific ones
+		common, groups = group_by_platform(sources, mask)
+		headers = self.pch_headers(common, generated.get_scanner()) if self.pch_threshold > 0 else []
+		exclude = glob_rules(self.unity_exclude) if self.unity != UNITY_OFF else None
+		if self.unity == UNITY_FILES:
+			common = self._unity_batch(generated, common, mask, exclude, prefix)
+			groups = [(shared, self._unity_batch(generated, entries, shared, exclude, prefix)) for shared, entries in groups]
+		if self.target_type == PROJECT_EXECUTABLE:
+			yield f"add_executable({self.name}"
+		else:
+			yield f"add_library({self.name} {self.target_type.upper()}"
+		for source in common:
+			yield f"    {source if isinstance(source, str) else source.get_cmake_path(prefix)}"
+		yield ")"
+		yield ""
+		yield from iter_cmake_platform_groups(self.name, "target_sources", groups, prefix)
+		if libraries:
+			yield f"target_link_libraries({self.name} PRIVATE {' '.join(libraries)})"
+			yield ""
+		if generated.linker != LINKER_DEFAULT and self.target_type in (PROJECT_EXECUTABLE, PROJECT_SHARED):
+			yield "if(CMAKEGEN_FAST_LINKER)"
+			yield f"    target_link_options({self.name} PRIVATE -fuse-ld={generated.linker})"
+			yield "endif()"
+			yield ""
+		
+		# Let CMake batch the sources, except the excluded ones
+		if self.unity == UNITY_CMAKE:
+			yield f"set_target_properties({self.name} PROPERTIES UNITY_BUILD ON UNITY_BUILD_BATCH_SIZE {self.unity_batch_size})"
+			excluded = [source.get_cmake_path(prefix) for source in sources if source.path and exclude and exclude.match(source.get_cmake_path().replace('\\', '/'))]
+			if excluded:
+				yield "set_source_files_properties("
+				for path in excluded:
+					yield f"    {path}"
+				yield "    PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON)"
+			yield ""
+		
+		# Precompile the headers most sources include, for C++ only
+		if headers:
+			path = generated.add_pch(self.name, headers, prefix or "${CMAKE_CURRENT_SOURCE_DIR}/")
+			yield f"target_precompile_headers({self.name} PRIVATE \"$<$<COMPILE_LANGUAGE:CXX>:{path}>\")"
+			yield ""
+		
+		# Add include directories
+		if include_dirs:
+			common, groups = group_by_platform(include_dirs, mask)
+			if common:
+				yield f"target_include_directories({self.name} PRIVATE"
+				for include_dir in common:
+					yield f"    {include_dir.get_cmake_path(prefix)}"
+				yield ")"
+				yield ""
+			yield from iter_cmake_platform_groups(self.name, "target_include_directories", groups, prefix)
+		
+		# Add library directories
+		if self.library_dirs:
+			common, groups = group_by_platform(self.library_dirs, mask)
+			if common:
+				yield f"target_link_directories({self.name} PRIVATE"
+				for lib_dir in common:
+					yield f"    {lib_dir.get_cmake_path(prefix)}"
+				yield ")"
+				yield ""
+			yield from iter_cmake_platform_groups(self.name, "target_link_directories", groups, prefix)
+		
+		if mask != PLATFORM_ALL:
+			yield "endif()"
+			yield ""
+
+	def _unity_batch(self, generated, sources, mask, exclude, prefix):
+		"""Replace the C and C++ sources of one platform group by unity batch files
+		@return	Array of the remaining path_info followed by the CMake paths of the batch files"""
+		kept = []
+		by_ext = {}
+		for source in sources:
+			ext = os.path.splitext(source.path)[1][1:].lower()
+			if ext not in EXTENSIONS_CPP or source.type == PATHINFO_TYPE_ENV or (exclude and exclude.match(source.get_cmake_path().replace('\\', '/'))):
+				kept.append(source)
+			else:
+				by_ext.setdefault("c" if ext == "c" else "cpp", []).append(source.get_absolute())
+		tag = "all" if mask == PLATFORM_ALL else "_".join(platform_names(mask))
+		used = {}
+		for ext in sorted(by_ext):
+			for dirname, batches in unity_batches(by_ext[ext], self.unity_batch_size, self.unity_batch_bytes):
+				if generated.root:
+					try:
+						dirname = os.path.relpath(dirname, generated.root)
+					except ValueError:
+						pass		# Another drive
+				dirtag = unity_dir_name(dirname.replace('\\', '/'), used)
+				for n, batch in enumerate(batches):
+					kept.append(generated.add_unity(self.name, f"unity_{tag}_{dirtag}_{n}.{ext}", batch, prefix))
+		return kept
+
+	def scan_includes(self, index, scanner):
+		"""Find which include directories the sources actually use
+		A directory is used when some #include, followed from the sources, is first found there.
+		@param	index	tree_index of the solution root, also searched for headers no directory provides
+		@param	scanner	include_scanner caching the parsed directives
+		@return	Dict with 'used' and 'unused' (listed include_dirs entries), 'hits' (absolute directory ->
+				includes found there), 'missing' (directory relative to the root -> includes it would
+				resolve) and 'unresolved' (includes found nowhere, usually system headers)"""
+		sources, include_dirs = self.discover(index)
+		dirs = []
+		for info in include_dirs:
+			if info.path and info.type != PATHINFO_TYPE_ENV:
+				dirs.append(info.get_absolute())
+		hits, unresolved = scanner.resolve([info.get_absolute() for info in sources if info.path], dirs)
+		
+		used = []
+		unused = []
+		for info in self.include_dirs:
+			if not info.path or info.type == PATHINFO_TYPE_ENV:
+				continue
+			(used if hits.get(info.get_absolute()) else unused).append(info)
+		
+		# Directories of the tree that would resolve the missing headers
+		missing = {}
+		if unresolved and index is not None:
+			headers, dirs = index.scan(glob_rules([f"**/*.{ext}" for ext in EXTENSIONS_HEADER]))
+			by_name = {}
+			for relpath in headers:
+				by_name.setdefault(relpath.rsplit('/', 1)[-1], []).append(relpath)
+			for name, count in unresolved.items():
+				name = name.replace('\\', '/')
+				for relpath in by_name.get(name.rsplit('/', 1)[-1], []):
+					if relpath == name or relpath.endswith('/' + name):
+						dirname = relpath[:len(relpath) - len(name)].rstrip('/') or '.'
+						missing[dirname] = missing.get(dirname, 0) + count
+						break
+		return {
+			'used': used,
+			'unused': unused,
+			'hits': hits,
+			'missing': missing,
+			'unresolved': sum(unresolved.values()) - sum(missing.values()),
+		}
+
+	def pch_headers(self, sources, scanner):
+		"""Headers included by at least pch_threshold percent of the C++ sources
+		Only <name> includes outside any #if are counted: system and third-party headers
+		change rarely, and are safe to include in every source.
+		@param	sources	Array of path_info built on every platform of the project
+		@param	scanner	include_scanner caching the parsed directives
+		@return	Array of include names, most frequent first"""
+		paths = []
+		for info in sources:
+			ext = os.path.splitext(info.path)[1][1:].lower()
+			if info.type != PATHINFO_TYPE_ENV and ext in EXTENSIONS_CPP and ext != "c":
+				paths.append(info.get_absolute())
+		if not paths:
+			return []
+		exclude = glob_rules(self.pch_exclude)
+		counts = {}
+		for includes in scanner.includes(paths).values():
+			for name in set(name for quoted, name, conditional in includes if not quoted and not conditional):
+				if not (exclude and exclude.match(name)):
+					counts[name] = counts.get(name, 0) + 1
+		need = max(1, len(paths) * self.pch_threshold / 100)
+		names = sorted((name for name, count in counts.items() if count >= need), key=lambda name: (-counts[name], name))
+		return names[:self.pch_max_headers]
+
+	def cmake_version(self):
+		"""Oldest CMake accepting the commands emitted for this project"""
+		mask = platform_mask(self.platform)
+		if not mask:
+			return (3, 10)
+		if self.unity == UNITY_CMAKE or self.pch_threshold > 0:
+			return (3, 16)		# UNITY_BUILD, target_precompile_headers()
+		if self.library_dirs:
+			return (3, 13)		# target_link_directories()
+		if not self.source_rules and not any((info.platform_mask & mask) == mask and info.path for info in self.sources):
+			return (3, 11)		# add_executable() without sources
+		return (3, 10)
+
+	def fingerprint(self, index):
+		"""Digest of the source set and include directories the project would emit"""
+		sources, include_dirs = self.discover(index)
+		h = hashlib.sha256()
+		for pathlist in (sources, include_dirs, self.library_dirs):
+			for info in pathlist:
+				h.update(f"{info.path}\0{info.platform_mask}\n".encode('utf-8'))
+			h.update(b'\1')
+		return h.hexdigest()
+
 # ----------------------------------------------------------------------
 class solution:
+	SCHEMA = [
+		('name', FIELD_OPTIONAL_STR),
+		('projects', [project]),
+		('layout', FIELD_STR, CMAKE_LAYOUT_SINGLE),
+		('compiler_launcher', FIELD_STR, LAUNCHER_NONE),
+		('linker', FIELD_STR, LINKER_DEFAULT),
+		('preset_generator', FIELD_STR, PRESET_NONE),
+		('preset_jobs', FIELD_INT, 0),
+		('preset_build_dir', FIELD_STR, "build"),
+	]
+
 	"""Constructor"""
 	def __init__(self):
 		self.name = None
-		self.path = None
+		self.root = path_root()		# Shared by every path_info of the solution
 		self.projects = []
+		self.layout = CMAKE_LAYOUT_SINGLE	# One of CMAKE_LAYOUTS
+		self.compiler_launcher = LAUNCHER_NONE	# One of LAUNCHERS
+		self.linker = LINKER_DEFAULT		# One of LINKERS
+		self.preset_generator = PRESET_NONE	# One of PRESET_GENERATORS, PRESET_NONE writes no CMakePresets.json
+		self.preset_jobs = 0				# Parallel build jobs, 0 for the generator's default
+		self.preset_build_dir = "build"		# Build trees, relative to the solution directory
+
+	@property
+	def path(self):
+		return self.root.path
+
+	@path.setter
+	def path(self, value):
+		self.root.path = value
 
 	def add_project(self, proj):
 		self.projects.append(proj)
@@ -214,92 +1793,378 @@ class solution:
 		return proj
 
 	def set_path(self, in_path):
-		for proj in self.projects:
-			proj.change_base_path(self.path, in_path)
-		self.path = in_path
-
-	def get_savepath(self):
-		return os.path.join(self.path, FILENAME_CONFIG)
+		"""Move the solution root in O(1); paths are rebased lazily when rendered"""
+		with profile_phase("rebase"):
+			self.path = in_path
 
-	def save(self):
-		data = to_dict(self)
-		del data['path']
+	def attach_paths(self):
+		"""Share the solution root with every path of every project"""
+		for proj in self.projects:
+			for pathlist in (proj.include_dirs, proj.library_dirs, proj.sources):
+				for info in pathlist:
+					info.attach(self.root)
+
+	def get_build_dirs(self):
+		"""Build trees of the presets, relative to the solution directory and '/' separated;
+		the scanner and the watchers leave them out"""
+		if self.preset_generator == PRESET_NONE:
+			return []
+		reldir = posixpath.normpath(self.preset_build_dir.replace(os.sep, '/').strip('/'))
+		if reldir == '.' or reldir.startswith('..'):
+			return []
+		return [reldir]
+
+	def new_index(self, shared=None):
+		"""tree_index of the solution directory, without the build trees"""
+		return tree_index(self.path, shared, self.get_build_dirs())
+
+	def get_savepath(self, compact=False):
+		return os.path.join(self.path, FILENAME_CONFIG_COMPACT if compact else FILENAME_CONFIG)
+
+	def save(self, compact=False, filepath=None):
+		"""Save the config as CMakeConfig.json, or in the compact columnar format"""
+		if compact:
+			return self.save_compact(filepath)
+		if filepath is None:
+			filepath = self.get_savepath()
+		with open(filepath, 'w', buffering=WRITE_BUFFER_SIZE) as outfile:
+			schema_dump(outfile, self, solution.SCHEMA)
+		return True
 
-		filepath = self.get_savepath()
+	def save_compact(self, filepath=None):
+		"""Save paths as shared string table ids and platforms as bitmasks"""
+		table = string_table()
+		data = {
+			'format': CONFIG_FORMAT_COMPACT,
+			'version': CONFIG_COMPACT_VERSION,
+		}
+		data.update(schema_scalars(self, solution.SCHEMA))
+		data['platforms'] = SUPPORT_PLATFORMS
+		data['projects'] = [proj.tocompact(table) for proj in self.projects]
+		data['strings'] = table.strings
+
+		if filepath is None:
+			filepath = self.get_savepath(True)
 		with open(filepath, 'w') as outfile:
-			json.dump(data, outfile)
+			json.dump(data, outfile, separators=(',', ':'))
 		return True
 
 	def load(self, filepath):
+		"""Load either config format; the compact one is recognized by its 'format' key"""
+		with profile_phase("load"):
+			self._load(filepath)
+		with profile_phase("rebase"):
+			self.attach_paths()
+
+	def _load(self, filepath):
 		with open(filepath, 'r') as infile:
 			data = json.load(infile)
-		self.name = data['name']
-		self.path = os.path.dirname(filepath)
-		self.projects = []
-		for sproj in data['projects']:
-			proj = project.fromdict(sproj)
-			self.projects.append(proj)
-
-	def generate_cmake(self):
-		"""Generate CMakeLists.txt file"""
-		if not self.path or not os.path.isdir(self.path):
-			return False, "Solution path is not set or invalid"
+		if not isinstance(data, dict):
+			raise ValueError(f"{filepath}: expected a JSON object")
+		self.path = os.path.dirname(os.path.abspath(filepath))
+		where = os.path.basename(filepath)
+		if data.get('format') == CONFIG_FORMAT_COMPACT:
+			if data.get('version') != CONFIG_COMPACT_VERSION:
+				raise ValueError(f"Unsupported compact config version: {data.get('version')}")
+			strings = data.get('strings')
+			platforms = data.get('platforms')
+			schema_check(strings, FIELD_STR_LIST, f"{where}.strings")
+			schema_check(platforms, FIELD_STR_LIST, f"{where}.platforms")
+			def load_projects(value, where):
+				return [project.fromcompact(s, strings, platforms, f"{where}[{idx}]") for idx, s in enumerate(value)]
+			schema_load(self, data, solution.SCHEMA, where, {'projects': load_projects})
+		else:
+			schema_load(self, data, solution.SCHEMA, where)
+
+	def iter_cmake_header(self, generated=None):
+		"""Yield the lines at the top of the root CMakeLists.txt"""
+		version = max([(3, 10)] + [proj.cmake_version() for proj in self.projects])
+		if generated is not None and generated.shared_libs:
+			version = max(version, (3, 12))		# target_link_libraries() of OBJECT libraries
+		if self.linker != LINKER_DEFAULT:
+			version = max(version, (3, 18))		# check_linker_flag()
+		yield CMAKE_GENERATED_MARKER
+		yield f"cmake_minimum_required(VERSION {version[0]}.{version[1]})"
+		yield f"project({self.name})"
+		yield ""
+		
+		# Compiler cache, only used when the build machine has it too
+		launcher = find_compiler_launcher(self.compiler_launcher)
+		if launcher is not None:
+			yield f"find_program(CMAKEGEN_LAUNCHER {launcher})"
+			yield "if(CMAKEGEN_LAUNCHER)"
+			yield "    set(CMAKE_C_COMPILER_LAUNCHER ${CMAKEGEN_LAUNCHER})"
+			yield "    set(CMAKE_CXX_COMPILER_LAUNCHER ${CMAKEGEN_LAUNCHER})"
+			yield "endif()"
+			yield ""
 		
-		cmake_content = []
-		cmake_content.append(f"cmake_minimum_required(VERSION 3.10)")
-		cmake_content.append(f"project({self.name})")
-		cmake_content.append("")
+		# Faster linker, only used when the toolchain accepts it; see project.iter_cmake_content()
+		if self.linker != LINKER_DEFAULT:
+			yield "if(NOT MSVC)"
+			yield "    include(CheckLinkerFlag)"
+			yield f"    check_linker_flag(CXX \"-fuse-ld={self.linker}\" CMAKEGEN_FAST_LINKER)"
+			yield "endif()"
+			yield ""
 		
 		# Set C++ standard
 		for proj in self.projects:
 			if proj.stdcpp != "default":
 				std_version = proj.stdcpp.replace("C++", "")
-				cmake_content.append(f"set(CMAKE_CXX_STANDARD {std_version})")
-				cmake_content.append(f"set(CMAKE_CXX_STANDARD_REQUIRED ON)")
+				yield f"set(CMAKE_CXX_STANDARD {std_version})"
+				yield f"set(CMAKE_CXX_STANDARD_REQUIRED ON)"
 				break
 		
-		cmake_content.append("")
+		yield ""
+
+	def share_sources(self, index, generated):
+		"""Move sources compiled the same way by several projects into OBJECT libraries
+		Sources are compared by canonical path. They are shared by projects that build them on
+		all of their platforms, with the same platforms and include directories, so that one
+		compilation serves every consumer. OBJECT projects have no link step and never share;
+		SHARED projects never share either, their sources are compiled with <target>_EXPORTS.
+		Fills generated.discovered, generated.shared_libs and generated.moved."""
+		owners = {}		# (settings id, canonical path) -> ([project, ...], first path_info)
+		settings = {}	# (platform mask, include directories) -> settings id, hashed once per project
+		masks = []		# settings id -> platform mask
+		for proj in self.projects:
+			sources, include_dirs = proj.discover(index)
+			generated.discovered[id(proj)] = (sources, include_dirs)
+			mask = platform_mask(proj.platform)
+			if not mask or proj.target_type in (PROJECT_OBJECT, PROJECT_SHARED):
+				continue
+			key = (mask, tuple((info.get_absolute(), info.platform_mask & mask) for info in include_dirs if info.path))
+			key_id = settings.setdefault(key, len(settings))
+			if key_id == len(masks):
+				masks.append(mask)
+			for info in sources:
+				if not info.path or info.type == PATHINFO_TYPE_ENV or (info.platform_mask & mask) != mask:
+					continue
+				consumers, first = owners.setdefault((key_id, os.path.normcase(info.get_absolute())), ([], info))
+				if proj not in consumers:
+					consumers.append(proj)
 		
-		# Generate for each project
+		# One library per set of consumers, in order of first appearance
+		groups = {}
+		for (key_id, path), (consumers, first) in owners.items():
+			if len(consumers) > 1:
+				group = groups.setdefault((key_id, tuple(id(proj) for proj in consumers)), (consumers, [], []))
+				group[1].append(path)
+				group[2].append(first)
+		for (key_id, ids), (consumers, paths, sources) in groups.items():
+			name = f"{self.name}_shared{len(generated.shared_libs) + 1}"
+			generated.shared_libs.append({
+				'name': name,
+				'consumers': consumers,
+				'mask': masks[key_id],
+				'sources': sources,
+				'include_dirs': generated.discovered[id(consumers[0])][1],
+			})
+			for proj in consumers:
+				moved, libraries = generated.moved.setdefault(id(proj), (set(), []))
+				moved.update(paths)
+				libraries.append(name)
+
+	def iter_cmake_shared(self, generated, prefix=""):
+		"""Yield the OBJECT libraries found by share_sources()"""
+		for lib in generated.shared_libs:
+			name = lib['name']
+			mask = lib['mask']
+			yield f"# Sources shared by: {', '.join(proj.name for proj in lib['consumers'])}"
+			if mask != PLATFORM_ALL:
+				yield f"if({platform_condition(mask)})"
+			yield f"add_library({name} OBJECT"
+			for source in lib['sources']:
+				yield f"    {source.get_cmake_path(prefix)}"
+			yield ")"
+			yield ""
+			common, groups = group_by_platform(lib['include_dirs'], mask)
+			if common:
+				yield f"target_include_directories({name} PRIVATE"
+				for include_dir in common:
+					yield f"    {include_dir.get_cmake_path(prefix)}"
+				yield ")"
+				yield ""
+			yield from iter_cmake_platform_groups(name, "target_include_directories", groups, prefix)
+			if mask != PLATFORM_ALL:
+				yield "endif()"
+				yield ""
+
+	def make_presets(self, generated=None):
+		"""Configure and build presets for CMakePresets.json
+		One configure preset per build type with Ninja, or a single one with Ninja Multi-Config;
+		one build preset per build type for the whole solution, and one per project, only
+		available on the hosts where its target exists.
+		@param	generated	generated_files of the emitted CMakeLists.txt, for the platforms of each target"""
+		build_dir = "${sourceDir}/" + self.preset_build_dir.replace(os.sep, '/').strip('/')
+		configure = []
+		if self.preset_generator == PRESET_NINJA_MULTI:
+			configure.append({
+				'name': "multi",
+				'displayName': PRESET_NINJA_MULTI,
+				'generator': PRESET_NINJA_MULTI,
+				'binaryDir': build_dir + "/multi",
+				'cacheVariables': {'CMAKE_CONFIGURATION_TYPES': ';'.join(PRESET_BUILD_TYPES)},
+			})
+		else:
+			for build_type in PRESET_BUILD_TYPES:
+				configure.append({
+					'name': build_type.lower(),
+					'displayName': f"{self.preset_generator} {build_type}",
+					'generator': self.preset_generator,
+					'binaryDir': build_dir + "/" + build_type.lower(),
+					'cacheVariables': {'CMAKE_BUILD_TYPE': build_type},
+				})
+		build = []
+		for build_type in PRESET_BUILD_TYPES:
+			for proj in [None] + self.projects:
+				condition = None
+				if proj is not None:
+					mask = platform_mask(proj.platform)
+					if generated is not None:
+						mask = generated.masks.get(id(proj), mask)
+					if not mask:
+						continue
+					condition = preset_condition(mask)
+				preset = {
+					'name': build_type.lower() if proj is None else f"{build_type.lower()}-{proj.name}",
+					'displayName': build_type if proj is None else f"{proj.name} {build_type}",
+				}
+				if self.preset_generator == PRESET_NINJA_MULTI:
+					preset['configurePreset'] = "multi"
+					preset['configuration'] = build_type
+				else:
+					preset['configurePreset'] = build_type.lower()
+				if proj is not None:
+					preset['targets'] = [proj.name]
+				if condition is not None:
+					preset['condition'] = condition
+				if self.preset_jobs > 0:
+					preset['jobs'] = self.preset_jobs
+				build.append(preset)
+		return {
+			'version': PRESET_VERSION,
+			'cmakeMinimumRequired': {'major': 3, 'minor': 21, 'patch': 0},
+			'configurePresets': configure,
+			'buildPresets': build,
+			'vendor': {PRESET_VENDOR: {'generated': True}},
+		}
+
+	def _iter_cmake_root(self, index, generated):
+		if self.compiler_launcher not in LAUNCHERS:
+			raise ValueError(f"Unknown compiler launcher '{self.compiler_launcher}', expected one of {', '.join(LAUNCHERS)}")
+		if self.linker not in LINKERS:
+			raise ValueError(f"Unknown linker '{self.linker}', expected one of {', '.join(LINKERS)}")
+		generated.linker = self.linker
+		if len(self.projects) > 1:
+			self.share_sources(index, generated)
+		yield from self.iter_cmake_header(generated)
+		yield from self.iter_cmake_shared(generated)
 		for proj in self.projects:
-			cmake_content.append(f"# Project: {proj.name}")
-			
-			# Add executable
-			cmake_content.append(f"add_executable({proj.name}")
-			
-			# Add source files
-			for source in proj.sources:
-				if source.path:
-					cmake_content.append(f"    {source.path}")
-			cmake_content.append(")")
-			cmake_content.append("")
-			
-			# Add include directories
-			if proj.include_dirs:
-				cmake_content.append(f"target_include_directories({proj.name} PRIVATE")
-				for include_dir in proj.include_dirs:
-					if include_dir.path:
-						cmake_content.append(f"    {include_dir.path}")
-				cmake_content.append(")")
-				cmake_content.append("")
-			
-			# Add library directories
-			if proj.library_dirs:
-				cmake_content.append(f"target_link_directories({proj.name} PRIVATE")
-				for lib_dir in proj.library_dirs:
-					if lib_dir.path:
-						cmake_content.append(f"    {lib_dir.path}")
-				cmake_content.append(")")
-				cmake_content.append("")
-		
-		# Write CMakeLists.txt
-		cmake_file = os.path.join(self.path, "CMakeLists.txt")
+			if self.layout == CMAKE_LAYOUT_SINGLE:
+				yield from proj.iter_cmake_content(index, "", generated)
+			else:
+				yield f"add_subdirectory({proj.name})"
+
+	def iter_cmake_files(self, index=None, generated=None):
+		"""Yield (file path, line generator) for every CMakeLists.txt of the solution,
+		followed by the generated unity batch files and PCH headers
+		Each generator is lazy: sources are discovered and emitted as it is consumed,
+		so the generated files are only known once every CMakeLists.txt has been consumed."""
+		if generated is None:
+			generated = generated_files(self.path)
+		yield os.path.join(self.path, FILENAME_CMAKE), self._iter_cmake_root(index, generated)
+		if self.layout != CMAKE_LAYOUT_SINGLE:
+			# One CMakeLists.txt per project, in a subdirectory named after it
+			for proj in self.projects:
+				yield self.get_project_cmake_path(proj), self._iter_cmake_project(proj, index, generated)
+		yield from generated.files
+
+	def get_project_cmake_path(self, proj):
+		"""CMakeLists.txt of a project in the per-project layout"""
+		return os.path.join(self.path, proj.name, FILENAME_CMAKE)
+
+	def _iter_cmake_project(self, proj, index, generated):
+		yield CMAKE_GENERATED_MARKER
+		yield from proj.iter_cmake_content(index, "${CMAKE_SOURCE_DIR}/", generated)
+
+	def generate_cmake(self, index=None, report=None):
+		"""Generate CMakeLists.txt file
+		@param	index	tree_index to reuse, a new one is loaded by default
+		@param	report	Optional dict that receives 'written' and 'unchanged' file lists"""
+		with profile_phase("generate"):
+			return self._generate_cmake(index, report)
+
+	def _generate_cmake(self, index, report):
+		if not self.path or not os.path.isdir(self.path):
+			return False, "Solution path is not set or invalid"
+		
+		# A project named after a source directory must not replace its hand-written CMakeLists.txt
+		if self.layout != CMAKE_LAYOUT_SINGLE:
+			foreign = [path for path in map(self.get_project_cmake_path, self.projects) if not is_generated_cmake(path)]
+			if foreign:
+				return False, f"Not generated by cmakegen, rename the project or delete the file: {', '.join(foreign)}"
+		
+		if index is None:
+			index = self.new_index()
+		
+		# Write CMakeLists.txt only when its content changed, so CMake does not reconfigure
+		files = []
+		written = 0
+		if report is None:
+			report = {}
+		report['written'] = []
+		report['unchanged'] = []
+		generated = generated_files(self.path)
+		generated_written = 0
 		try:
-			with open(cmake_file, 'w', encoding='utf-8') as f:
-				f.write('\n'.join(cmake_content))
-			return True, f"CMakeLists.txt generated successfully at {cmake_file}"
+			cache = digest_cache(self.path)
+			for cmake_file, cmake_content in self.iter_cmake_files(index, generated):
+				os.makedirs(os.path.dirname(cmake_file), exist_ok=True)
+				if current_profiler is not None:
+					cmake_content = current_profiler.timed("emit", cmake_content)
+				with profile_phase("write"):
+					changed = write_lines_if_changed(cmake_file, cmake_content, cache)
+				if changed:
+					report['written'].append(cmake_file)
+				else:
+					report['unchanged'].append(cmake_file)
+				if os.path.basename(cmake_file) != FILENAME_CMAKE:
+					generated_written += changed
+					continue
+				written += changed
+				files.append(cmake_file)
+			
+			# CMakePresets.json, unless one was written by hand
+			presets_file = os.path.join(self.path, FILENAME_PRESETS)
+			presets_written = None
+			if self.preset_generator != PRESET_NONE:
+				if self.preset_generator not in PRESET_GENERATORS:
+					raise ValueError(f"Unknown preset generator '{self.preset_generator}', expected one of {', '.join(PRESET_GENERATORS)}")
+				if is_generated_presets(presets_file):
+					with profile_phase("write"):
+						presets_written = write_if_changed(presets_file, json.dumps(self.make_presets(generated), indent=2) + '\n', cache)
+					report['written' if presets_written else 'unchanged'].append(presets_file)
+			with profile_phase("write"):
+				generated.remove_stale(set(path for path, lines in generated.files))
+				generated.save()
+				cache.save()
+				index.save()
 		except Exception as e:
 			return False, f"Failed to generate CMakeLists.txt: {str(e)}"
+		cmake_file = files[0]
+		if len(files) > 1:
+			message = f"{written} of {len(files)} CMakeLists.txt files updated under {self.path}"
+		elif written:
+			message = f"CMakeLists.txt generated successfully at {cmake_file}"
+		else:
+			message = f"CMakeLists.txt is up to date at {cmake_file}"
+		if generated.files:
+			message += f" ({generated_written} of {len(generated.files)} generated sources updated)"
+		if presets_written:
+			message += f"; {FILENAME_PRESETS} updated"
+		elif self.preset_generator != PRESET_NONE and presets_written is None:
+			message += f"; {FILENAME_PRESETS} left alone, it was not generated by cmakegen"
+		return True, message
 
 
 
@@ -347,8 +2212,54 @@ def add_data_table(dt, columns, idx, on_checked):
 	row.idx = idx
 	dt.rows.append(row)
 
+# ----------------------------------------------------------------------
+##	Substring search over a path list
+#	The lower-cased paths are kept as one newline-joined string with a sorted array of
+#	line offsets, so a selective query is a run of str.find() calls plus a bisect per hit;
+#	a query matching many paths falls back to one pass over the lines.
+class path_search_index:
+	"""Constructor"""
+	def __init__(self, pathlist):
+		starts = []
+		lines = []
+		offset = 0
+		for info in pathlist:
+			line = (info.path or "").lower().replace('\n', ' ')
+			starts.append(offset)
+			lines.append(line)
+			offset += len(line) + 1
+		self.starts = starts
+		self.lines = lines
+		self.text = '\n'.join(lines)
+
+	def query(self, pattern):
+		"""Ascending indices of the paths containing pattern, case-insensitively"""
+		pattern = pattern.lower()
+		if not pattern:
+			return list(range(len(self.starts)))
+		if '\n' in pattern:
+			return []
+		if self.text.count(pattern) * 16 > len(self.starts):
+			return [idx for idx, line in enumerate(self.lines) if pattern in line]
+		out = []
+		text = self.text
+		starts = self.starts
+		pos = text.find(pattern)
+		while pos >= 0:
+			idx = bisect.bisect_right(starts, pos) - 1
+			if pos + len(pattern) <= (starts[idx + 1] - 1 if idx + 1 < len(starts) else len(text)):
+				out.append(idx)
+				# Continue on the next line: one hit per path is enough
+				if idx + 1 >= len(starts):
+					break
+				pos = text.find(pattern, starts[idx + 1])
+			else:
+				pos = text.find(pattern, pos + 1)
+		return out
+
 # ----------------------------------------------------------------------
 ##	ListView of pathes
+#	Only the current page of LISTVIEW_PAGE_SIZE rows exists as controls.
 class listview_path:
 	"""Constructor"""
 	def __init__(self, in_type, in_owner, proj, in_list_path):
@@ -357,6 +2268,12 @@ class listview_path:
 		self.owner = in_owner
 		self.dt = None
 		self.list_path = in_list_path	# ! Direct referefence to the path list
+		self.page = 0
+		self.selected = set()			# Indices into list_path of checked rows, on any page
+		self.pager = None
+		self.filter_text = ""
+		self.search_index = None		# path_search_index, rebuilt after the list changes
+		self.visible = None				# Indices matching filter_text, None when not filtering
 
 	def build(self, parent, title):
 		# Title with icon
@@ -370,17 +2287,43 @@ class listview_path:
 		], spacing=12)
 		parent.controls.append(title_row)
 		
-		names = []
-		names.append("Path")
-		for platname in SUPPORT_PLATFORMS:
-			if platname in self.project.platform:
-				names.append(platname)
-		self.dt = make_data_table(names, True)
+		# Filter and bulk actions on matching rows
+		filter_field = flet.TextField(
+			label="Filter",
+			prefix_icon="search",
+			on_change=self.on_change_filter,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8,
+			expand=True
+		)
+		selbtn = flet.TextButton("Check Matching", icon="done_all", on_click=self.on_press_select_matching, style=flet.ButtonStyle(color=COLORS["primary"]))
+		clrbtn = flet.TextButton("Uncheck All", icon="remove_done", on_click=self.on_press_clear_selection, style=flet.ButtonStyle(color=COLORS["primary"]))
+		platmenu = flet.PopupMenuButton(
+			icon="computer",
+			tooltip="Set platform of checked rows",
+			items=[
+				flet.PopupMenuItem(text=f"{action} {platname}", on_click=self.on_press_set_platform, data=(platname, action == "Enable"))
+				for platname in SUPPORT_PLATFORMS for action in ("Enable", "Disable")
+			]
+		)
+		parent.controls.append(flet.Row([filter_field, selbtn, clrbtn, platmenu], spacing=12))
+		
+		self.dt = make_data_table(self.get_column_names(), True)
+		
+		# Pager
+		self.btn_prev = flet.IconButton(icon="chevron_left", icon_color=COLORS["text_primary"], on_click=self.on_press_prev_page)
+		self.btn_next = flet.IconButton(icon="chevron_right", icon_color=COLORS["text_primary"], on_click=self.on_press_next_page)
+		self.txt_page = flet.Text("", color=COLORS["text_secondary"])
+		self.pager = flet.Row([self.btn_prev, self.txt_page, self.btn_next], spacing=8)
 		self.update_list(False)
 		
 		# Card container for table
 		table_card = flet.Container(
-			content=self.dt,
+			content=flet.Column([self.dt, self.pager], spacing=8),
 			padding=16,
 			bgcolor=COLORS["surface"],
 			border_radius=12,
@@ -418,79 +2361,221 @@ class listview_path:
 			)
 		)
 		button_row = flet.Row(spacing=12, controls=[addbtn, delbtn])
+		if self.type == LISTVIEW_TYPE_FILES:
+			folderbtn = flet.ElevatedButton(
+				"Add Folder",
+				icon=flet.Icon("create_new_folder", color=COLORS["success"]),
+				on_click=self.on_press_add_folder,
+				bgcolor=COLORS["success"],
+				color=COLORS["text_primary"],
+				style=flet.ButtonStyle(
+					shape=flet.RoundedRectangleBorder(radius=8),
+					padding=12
+				)
+			)
+			button_row.controls.insert(1, folderbtn)
 		parent.controls.append(button_row)
 		
 		# Add spacing
 		parent.controls.append(flet.Container(height=20))
 
-	def update_list(self, update_immediately=True):
+	def get_column_names(self):
 		names = []
 		names.append("Path")
 		for platname in SUPPORT_PLATFORMS:
 			if platname in self.project.platform:
 				names.append(platname)
-		self.dt.columns = make_data_table_columuns(names) 
-		self.dt.rows.clear()
-		idx = 0
-		for item in self.list_path:
-			text = flet.Text(item.path, color=COLORS["text_secondary"])
-			clmns = [text]
-			for platname in SUPPORT_PLATFORMS:
-				if platname in self.project.platform:
-					if platname in item.platform:
-						init = True
-					else:
-						init = False
-					chk = flet.Checkbox(
-						value=init, 
-						on_change=self.on_platform_choosed,
-						fill_color=COLORS["primary"],
-						check_color=COLORS["text_primary"]
-					)
-					chk.platform = platname
-					chk.idx = idx
-					clmns.append(chk)
-			add_data_table(self.dt, clmns, idx, self.on_selection_changed)
-			idx += 1
+		return names
+
+	def get_visible_count(self):
+		return len(self.visible) if self.visible is not None else len(self.list_path)
+
+	def get_page_count(self):
+		return max(1, (self.get_visible_count() + LISTVIEW_PAGE_SIZE - 1) // LISTVIEW_PAGE_SIZE)
+
+	def invalidate_search(self):
+		"""Forget the search index after the list or its rendering changed"""
+		self.search_index = None
+
+	def apply_filter(self):
+		if not self.filter_text:
+			self.visible = None
+			return
+		if self.search_index is None:
+			self.search_index = path_search_index(self.list_path)
+		self.visible = self.search_index.query(self.filter_text)
+
+	def add_row(self, idx):
+		"""Append the row of list_path[idx] to the table"""
+		item = self.list_path[idx]
+		text = flet.Text(item.path, color=COLORS["text_secondary"])
+		clmns = [text]
+		for platname in SUPPORT_PLATFORMS:
+			if platname in self.project.platform:
+				chk = flet.Checkbox(
+					value=item.has_platform(platname), 
+					on_change=self.on_platform_choosed,
+					fill_color=COLORS["primary"],
+					check_color=COLORS["text_primary"]
+				)
+				chk.platform = platname
+				chk.idx = idx
+				clmns.append(chk)
+		add_data_table(self.dt, clmns, idx, self.on_selection_changed)
+		self.dt.rows[-1].selected = idx in self.selected
+
+	def update_pager(self, update_immediately=True):
+		count = self.get_visible_count()
+		start = self.page * LISTVIEW_PAGE_SIZE
+		end = min(start + LISTVIEW_PAGE_SIZE, count)
+		if count == 0:
+			self.txt_page.value = "No entries"
+		else:
+			self.txt_page.value = f"{start + 1}-{end} of {count}"
+		if self.visible is not None:
+			self.txt_page.value += f" (filtered from {len(self.list_path)})"
+		if self.selected:
+			self.txt_page.value += f", {len(self.selected)} checked"
+		self.btn_prev.disabled = self.page == 0
+		self.btn_next.disabled = self.page >= self.get_page_count() - 1
 		if update_immediately:
-			self.dt.update()
+			self.pager.update()
+
+	def update_list(self, update_immediately=True):
+		"""Rebuild the columns and the rows of the current page"""
+		with profile_phase("update_list"):
+			self.dt.columns = make_data_table_columuns(self.get_column_names()) 
+			self.dt.rows.clear()
+			self.apply_filter()
+			self.page = min(self.page, self.get_page_count() - 1)
+			start = self.page * LISTVIEW_PAGE_SIZE
+			for pos in range(start, min(start + LISTVIEW_PAGE_SIZE, self.get_visible_count())):
+				self.add_row(self.visible[pos] if self.visible is not None else pos)
+			self.update_pager(False)
+			if update_immediately:
+				self.dt.update()
+				self.pager.update()
+
+	def show_page(self, page):
+		self.page = max(0, min(page, self.get_page_count() - 1))
+		self.update_list(True)
+
+	def on_change_filter(self, e):
+		self.filter_text = e.control.value.strip()
+		self.page = 0
+		self.update_list(True)
+
+	def on_press_select_matching(self, e):
+		"""Check every row matching the filter, on all pages"""
+		self.apply_filter()
+		if self.visible is not None:
+			self.selected.update(self.visible)
+		else:
+			self.selected.update(range(len(self.list_path)))
+		self.update_list(True)
+
+	def on_press_clear_selection(self, e):
+		self.selected.clear()
+		self.update_list(True)
+
+	def on_press_set_platform(self, e):
+		"""Enable or disable a platform on every checked row in one pass"""
+		platname, enable = e.control.data
+		bit = PLATFORM_BITS[platname]
+		for idx in self.selected:
+			if idx < len(self.list_path):
+				info = self.list_path[idx]
+				info.platform_mask = info.platform_mask | bit if enable else info.platform_mask & ~bit
+		self.update_list(True)
+
+	def on_press_prev_page(self, e):
+		self.show_page(self.page - 1)
+
+	def on_press_next_page(self, e):
+		self.show_page(self.page + 1)
 
 	def on_press_add_path(self, e):
 		init_path = self.owner.get_solution_path()
 		if init_path is None:
 			init_path = self.owner.get_init_path()
 		if self.type == LISTVIEW_TYPE_DIRS:
-			self.owner.choose_a_dir("Choose path", init_path, self.on_path_selected)
+			self.owner.choose_a_dir("Choose path", init_path, self.add_paths)
 		elif self.type == LISTVIEW_TYPE_FILES:
-			self.owner.choose_a_file("Choose file", init_path, self.on_path_selected)
+			self.owner.choose_a_file("Choose files", init_path, self.add_paths)
 
-	def on_path_selected(self, path):
-		base_path = self.owner.get_solution_path()
-		info = path_info(path, base_path)
+	def on_press_add_folder(self, e):
+		init_path = self.owner.get_solution_path()
+		if init_path is None:
+			init_path = self.owner.get_init_path()
+		self.owner.choose_a_dir("Choose folder to add sources from", init_path, self.on_folder_selected)
+
+	def on_folder_selected(self, paths):
+		"""Add every C/C++ source below the chosen folders"""
+		rules = glob_rules(["**/*." + ext for ext in EXTENSIONS_CPP])
+		found = []
+		for folder in paths:
+			files, dirs = tree_index(folder).scan(rules)
+			found.extend(os.path.join(folder, relpath) for relpath in files)
+		self.add_paths(found)
+
+	def add_paths(self, paths):
+		"""Append paths not in the list yet and refresh the table once
+		@return	Number of entries added"""
+		root = self.owner.get_solution_root()
+		mask = platform_mask(self.project.platform)
+		known = set(info.get_absolute() for info in self.list_path)
+		first = len(self.list_path)
+		for path in paths:
+			path = os.path.normpath(path)
+			if path in known:
+				continue
+			known.add(path)
+			info = path_info(path, root)
+			info.platform_mask = mask
+			self.list_path.append(info)
+		last = len(self.list_path) - 1
+		if last < first:
+			return 0
+		self.invalidate_search()
+		if self.visible is not None:
+			self.page = self.get_page_count()
+			self.update_list(True)
+		elif first // LISTVIEW_PAGE_SIZE == self.page and last // LISTVIEW_PAGE_SIZE == self.page:
+			# Every new entry lands on the visible page: append just their rows
+			for idx in range(first, last + 1):
+				self.add_row(idx)
+			self.dt.update()
+			self.update_pager(True)
+		else:
+			self.show_page(last // LISTVIEW_PAGE_SIZE)
+		return last + 1 - first
 
-		info.platform = self.project.platform.copy()
-		self.list_path.append(info)
+	def delete_indices(self, indices):
+		"""Remove many entries in one pass and refresh the table once"""
+		drop = set(indices)
+		if not drop:
+			return
+		self.list_path[:] = [info for idx, info in enumerate(self.list_path) if idx not in drop]
+		self.selected.clear()
+		self.invalidate_search()
 		self.update_list(True)
 
 	def on_selection_changed(self, e):
-		e.control.selected = e.data
+		e.control.selected = e.data in (True, "true")
+		if e.control.selected:
+			self.selected.add(e.control.idx)
+		else:
+			self.selected.discard(e.control.idx)
 		e.control.update()
 
 	def on_press_del_path(self, e):
-		selected  = []
-		for row in self.dt.rows:
-			if row.selected:
-				selected.append(row.idx)
-		for idx in reversed(selected):
-			if idx < len(self.list_path):
-				del self.list_path[idx]
-		self.update_list(True)
+		self.delete_indices(self.selected)
 
 	def on_platform_choosed(self, e):
 		idx = e.control.idx
 		platname = e.control.platform
 		if idx < len(self.list_path):
-			self.list_path[idx].set_platform(platname, e.data)
+			self.list_path[idx].set_platform(platname, bool(e.control.value))
 
 # ----------------------------------------------------------------------
 ##	Project tab
@@ -512,11 +2597,83 @@ class project_tab:
 		self.lv_library_dirs.update_list(True)
 		self.lv_source_files.update_list(True)
 
+	"""On change source rules"""
+	def on_change_source_rules(self, e):
+		self.project.source_rules = parse_rule_lines(e.control.value)
+
+	"""On change include directory rules"""
+	def on_change_include_rules(self, e):
+		self.project.include_rules = parse_rule_lines(e.control.value)
+
+	"""On change project type"""
+	def on_change_target_type(self, e):
+		self.project.target_type = e.control.value
+
+	"""On change unity build mode"""
+	def on_change_unity(self, e):
+		self.project.unity = e.control.value
+
+	"""On change unity batch size"""
+	def on_change_unity_batch_size(self, e):
+		try:
+			size = int(e.control.value)
+		except ValueError:
+			size = 0
+		if size > 0:
+			self.project.unity_batch_size = size
+			e.control.error_text = None
+		else:
+			e.control.error_text = "Enter a positive number"
+		e.control.update()
+
+	"""On change unity exclusion rules"""
+	def on_change_unity_exclude(self, e):
+		self.project.unity_exclude = parse_rule_lines(e.control.value)
+
+	"""On change precompiled header threshold"""
+	def on_change_pch_threshold(self, e):
+		try:
+			threshold = int(e.control.value)
+		except ValueError:
+			threshold = -1
+		if 0 <= threshold <= 100:
+			self.project.pch_threshold = threshold
+			e.control.error_text = None
+		else:
+			e.control.error_text = "Enter a percentage from 0 to 100"
+		e.control.update()
+
+	"""On change headers never precompiled"""
+	def on_change_pch_exclude(self, e):
+		self.project.pch_exclude = parse_rule_lines(e.control.value)
+
+	"""Check the include directories no source uses, so they can be deleted"""
+	def on_press_check_unused_includes(self, e):
+		root = self.owner.get_solution_root().path
+		if not root or not os.path.isdir(root):
+			self.owner.open_info_dialog("Include directories", "Set the solution path first.")
+			return
+		index = self.owner.new_index()
+		scanner = include_scanner(root)
+		result = self.project.scan_includes(index, scanner)
+		scanner.save()
+		index.save()
+		unused = set(id(info) for info in result['unused'])
+		self.lv_include_dirs.selected = set(idx for idx, info in enumerate(self.project.include_dirs) if id(info) in unused)
+		self.lv_include_dirs.update_list(True)
+		message = f"{len(unused)} unused include director{'y is' if len(unused) == 1 else 'ies are'} checked."
+		if result['missing']:
+			message += "\nNot listed but needed: " + ", ".join(sorted(result['missing']))
+		self.owner.open_info_dialog("Include directories", message)
+
 	"""On change c++ stadard"""
 	def on_change_cpp_standard(self, e):
 		self.project.stdcpp = e.control.value
 
 	def on_basepath_changed(self):
+		self.lv_include_dirs.invalidate_search()
+		self.lv_library_dirs.invalidate_search()
+		self.lv_source_files.invalidate_search()
 		self.lv_include_dirs.update_list(False)
 		self.lv_library_dirs.update_list(False)
 		self.lv_source_files.update_list(True)
@@ -540,7 +2697,19 @@ class project_tab:
 			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
 			text_style=flet.TextStyle(color=COLORS["text_primary"]),
 			bgcolor=COLORS["surface_light"],
-			border_radius=8
+			border_radius=8,
+			expand=True
+		)
+		dd_type = flet.Dropdown(
+			label="Type",
+			options=[flet.dropdown.Option(item) for item in PROJECT_TYPES],
+			value=self.project.target_type,
+			on_change=self.on_change_target_type,
+			width=200,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			bgcolor=COLORS["surface_light"],
+			color=COLORS["text_primary"]
 		)
 		
 		title = flet.Row([
@@ -554,7 +2723,7 @@ class project_tab:
 			expanded=True, 
 			bgcolor=COLORS["surface"],
 			content=flet.Container(
-				content=name_content,
+				content=flet.Row([name_content, dd_type], spacing=16),
 				padding=20,
 				bgcolor=COLORS["surface_light"],
 				border_radius=8
@@ -625,6 +2794,29 @@ class project_tab:
 		# include directories
 		self.lv_include_dirs = listview_path(LISTVIEW_TYPE_DIRS, self.owner, self.project, self.project.include_dirs)
 		self.lv_include_dirs.build(cpp_content, "Include directories")
+		cpp_content.controls.append(flet.TextButton(
+			"Check Unused Include Directories",
+			icon="rule",
+			on_click=self.on_press_check_unused_includes,
+			style=flet.ButtonStyle(color=COLORS["primary"])
+		))
+		
+		# Include directory rules
+		include_rules_content = flet.TextField(
+			label="Include directory rules (one glob per line, prefix ! to exclude)",
+			hint_text="**/include\n!third_party/**",
+			on_change=self.on_change_include_rules,
+			value='\n'.join(self.project.include_rules),
+			multiline=True,
+			min_lines=2,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8
+		)
+		cpp_content.controls.append(include_rules_content)
 		
 		# library directories
 		self.lv_library_dirs = listview_path(LISTVIEW_TYPE_DIRS, self.owner, self.project, self.project.library_dirs)
@@ -634,6 +2826,95 @@ class project_tab:
 		self.lv_source_files = listview_path(LISTVIEW_TYPE_FILES, self.owner, self.project, self.project.sources)
 		self.lv_source_files.build(cpp_content, "Source Files")
 		
+		# Source rules
+		rules_content = flet.TextField(
+			label="Source rules (one glob per line, prefix ! to exclude)",
+			hint_text="src/**/*.cpp\n!**/test/**",
+			on_change=self.on_change_source_rules,
+			value='\n'.join(self.project.source_rules),
+			multiline=True,
+			min_lines=2,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8
+		)
+		cpp_content.controls.append(rules_content)
+		
+		# Unity build
+		cpp_content.controls.append(flet.Text("Unity build", weight=flet.FontWeight.BOLD, color=COLORS["text_primary"]))
+		dd_unity = flet.Dropdown(
+			options=[flet.dropdown.Option(item) for item in UNITY_MODES],
+			value=self.project.unity,
+			on_change=self.on_change_unity,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			bgcolor=COLORS["surface_light"],
+			color=COLORS["text_primary"]
+		)
+		txt_batch_size = flet.TextField(
+			label="Sources per batch",
+			value=str(self.project.unity_batch_size),
+			on_change=self.on_change_unity_batch_size,
+			keyboard_type=flet.KeyboardType.NUMBER,
+			width=200,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8
+		)
+		cpp_content.controls.append(flet.Row([dd_unity, txt_batch_size], spacing=16))
+		unity_exclude_content = flet.TextField(
+			label="Sources kept out of unity batches (one glob per line)",
+			hint_text="src/legacy/**",
+			on_change=self.on_change_unity_exclude,
+			value='\n'.join(self.project.unity_exclude),
+			multiline=True,
+			min_lines=2,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8
+		)
+		cpp_content.controls.append(unity_exclude_content)
+		
+		# Precompiled header
+		cpp_content.controls.append(flet.Text("Precompiled header", weight=flet.FontWeight.BOLD, color=COLORS["text_primary"]))
+		txt_pch_threshold = flet.TextField(
+			label="Precompile <headers> included by this % of sources (0 disables)",
+			value=str(self.project.pch_threshold),
+			on_change=self.on_change_pch_threshold,
+			keyboard_type=flet.KeyboardType.NUMBER,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8
+		)
+		cpp_content.controls.append(txt_pch_threshold)
+		pch_exclude_content = flet.TextField(
+			label="Headers never precompiled (one glob per line)",
+			hint_text="mylib/**",
+			on_change=self.on_change_pch_exclude,
+			value='\n'.join(self.project.pch_exclude),
+			multiline=True,
+			min_lines=2,
+			border_color=COLORS["border"],
+			focused_border_color=COLORS["primary"],
+			label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+			text_style=flet.TextStyle(color=COLORS["text_primary"]),
+			bgcolor=COLORS["surface_light"],
+			border_radius=8
+		)
+		cpp_content.controls.append(pch_exclude_content)
+		
 		cpp_title = flet.Row([
 			flet.Icon("code", color=COLORS["accent"], size=28),
 			flet.Text(" C/C++", weight=flet.FontWeight.BOLD, size=24, color=COLORS["text_primary"])
@@ -714,10 +2995,9 @@ class window:
 	def __on_path_choosed(self, e):
 		if self.cb_choose_path is not None:
 			if e.path is not None:
-				self.cb_choose_path(e.path)
+				self.cb_choose_path([e.path])
 			elif e.files is not None:
-				for fileinfo in e.files:
-					self.cb_choose_path(fileinfo.path)
+				self.cb_choose_path([fileinfo.path for fileinfo in e.files])
 			self.cb_choose_path = None
 			return
 		self.solution.set_path( e.path )
@@ -742,13 +3022,32 @@ class window:
 		self.cb_choose_path = cb
 		self.choose_file.get_directory_path(dialog_title=title, initial_directory=initial_path)
 
+	"""Choose files; cb receives the array of chosen paths"""
 	def choose_a_file(self, title, initial_path, cb):
 		self.cb_choose_path = cb
-		self.choose_file.pick_files(dialog_title=title, initial_directory=initial_path, file_type=flet.FilePickerFileType.CUSTOM, allowed_extensions=EXTENSIONS_CPP, allow_multiple=False)
+		self.choose_file.pick_files(dialog_title=title, initial_directory=initial_path, file_type=flet.FilePickerFileType.CUSTOM, allowed_extensions=EXTENSIONS_CPP, allow_multiple=True)
 
 	def get_solution_path(self):
 		return self.solution.path
 
+	def get_solution_root(self):
+		return self.solution.root
+
+	def new_index(self):
+		return self.solution.new_index()
+
+	def on_change_preset_jobs(self, e):
+		try:
+			jobs = int(e.control.value)
+		except ValueError:
+			jobs = -1
+		if jobs >= 0:
+			self.solution.preset_jobs = jobs
+			e.control.error_text = None
+		else:
+			e.control.error_text = "Enter 0 or a positive number"
+		e.control.update()
+
 	def open_info_dialog(self, title, message):
 		self.dlg_info.title.value=title
 		self.dlg_info.content.value=message
@@ -864,6 +3163,65 @@ class window:
 						bgcolor=COLORS["surface_light"],
 						color=COLORS["text_primary"],
 						style=flet.ButtonStyle(shape=flet.RoundedRectangleBorder(radius=8), padding=12)
+					),
+					flet.Dropdown(
+						label="Layout",
+						options=[flet.dropdown.Option(item) for item in CMAKE_LAYOUTS],
+						value=self.solution.layout,
+						on_change=lambda e: setattr(self.solution, 'layout', e.control.value),
+						border_color=COLORS["border"],
+						focused_border_color=COLORS["primary"],
+						bgcolor=COLORS["surface_light"],
+						color=COLORS["text_primary"],
+						width=200
+					)
+				], spacing=12),
+				flet.Row([
+					flet.Dropdown(
+						label="Compiler cache",
+						options=[flet.dropdown.Option(item) for item in LAUNCHERS],
+						value=self.solution.compiler_launcher,
+						on_change=lambda e: setattr(self.solution, 'compiler_launcher', e.control.value),
+						border_color=COLORS["border"],
+						focused_border_color=COLORS["primary"],
+						bgcolor=COLORS["surface_light"],
+						color=COLORS["text_primary"],
+						width=200
+					),
+					flet.Dropdown(
+						label="Linker",
+						options=[flet.dropdown.Option(item) for item in LINKERS],
+						value=self.solution.linker,
+						on_change=lambda e: setattr(self.solution, 'linker', e.control.value),
+						border_color=COLORS["border"],
+						focused_border_color=COLORS["primary"],
+						bgcolor=COLORS["surface_light"],
+						color=COLORS["text_primary"],
+						width=200
+					),
+					flet.Dropdown(
+						label="CMakePresets.json",
+						options=[flet.dropdown.Option(item) for item in PRESET_GENERATORS],
+						value=self.solution.preset_generator,
+						on_change=lambda e: setattr(self.solution, 'preset_generator', e.control.value),
+						border_color=COLORS["border"],
+						focused_border_color=COLORS["primary"],
+						bgcolor=COLORS["surface_light"],
+						color=COLORS["text_primary"],
+						width=240
+					),
+					flet.TextField(
+						label="Build jobs (0 for default)",
+						value=str(self.solution.preset_jobs),
+						on_change=self.on_change_preset_jobs,
+						keyboard_type=flet.KeyboardType.NUMBER,
+						width=200,
+						border_color=COLORS["border"],
+						focused_border_color=COLORS["primary"],
+						label_style=flet.TextStyle(color=COLORS["text_secondary"]),
+						text_style=flet.TextStyle(color=COLORS["text_primary"]),
+						bgcolor=COLORS["surface_light"],
+						border_radius=8
 					)
 				], spacing=12)
 			], spacing=16),
@@ -984,7 +3342,7 @@ class window:
 			self.open_info_dialog("Error", message)
 
 # ----------------------------------------------------------------------
-def main(page: flet.Page):
+def main(page: "flet.Page"):
 	page.title = "CMake Generator"
 	page.theme_mode = flet.ThemeMode.DARK
 	page.window.width = 1600
@@ -994,12 +3352,527 @@ def main(page: flet.Page):
 	current_window.build(page)
 	page.update()
 
-current_solution = solution()
-if len(sys.argv) >= 2:
-	filename = sys.argv[1]
-	if os.path.isfile(filename):
-		current_solution.load(filename)
+# ----------------------------------------------------------------------
+##	Resolve a command line argument to a config file path
+#	@param	path	CMakeConfig.json or a solution directory containing it
+def find_config(path):
+	if os.path.isdir(path):
+		# Prefer whichever config format was written last
+		found = None
+		for name in (FILENAME_CONFIG, FILENAME_CONFIG_COMPACT):
+			filepath = os.path.join(path, name)
+			try:
+				mtime = os.stat(filepath).st_mtime_ns
+			except OSError:
+				continue
+			if found is None or mtime > found[0]:
+				found = (mtime, filepath)
+		return found[1] if found else os.path.join(path, FILENAME_CONFIG)
+	return path
+
+# ----------------------------------------------------------------------
+##	Convert configs between CMakeConfig.json and the compact format
+#	@param	configs		Array of config files or solution directories
+def run_convert(configs):
+	failed = 0
+	for arg in configs:
+		filepath = find_config(arg)
+		sln = solution()
+		try:
+			sln.load(filepath)
+			compact = os.path.basename(filepath) != FILENAME_CONFIG_COMPACT
+			sln.save(compact)
+			sys.stdout.write(f"Converted {filepath} to {sln.get_savepath(compact)}\n")
+		except Exception as e:
+			sys.stderr.write(f"Error: Failed to convert {filepath}: {str(e)}\n")
+			failed += 1
+	return 1 if failed else 0
+
+# ----------------------------------------------------------------------
+##	Load a config and write its CMakeLists.txt without the GUI
+#	@param	filepath	Path to CMakeConfig.json
+#	@param	shared		Optional scan cache shared with other solutions of the same tree
+#	@return	Dict with 'config', 'success', 'message', 'written', 'unchanged' and 'seconds',
+#			and 'profile' when profiling is enabled
+def generate_from_config(filepath, shared=None):
+	global current_profiler
+	outer = current_profiler
+	if outer is None:
+		return _generate_from_config(filepath, shared)
+	
+	# Profile each config on its own; the caller merges the reports, also from worker processes
+	current_profiler = profiler()
+	try:
+		result = _generate_from_config(filepath, shared)
+		result['profile'] = current_profiler.todict()
+	finally:
+		current_profiler = outer
+	return result
+
+def _generate_from_config(filepath, shared):
+	start = time.perf_counter()
+	result = {'config': filepath, 'success': False, 'written': [], 'unchanged': []}
+	if not os.path.isfile(filepath):
+		result['message'] = f"File not found: {filepath}"
 	else:
-		sys.stdout.write('Error: File not found: ' + filename)
-current_window = window(current_solution)
-flet.app(target=main)
+		sln = solution()
+		try:
+			sln.load(filepath)
+		except Exception as e:
+			sln = None
+			result['message'] = f"Failed to load {filepath}: {str(e)}"
+		if sln is not None:
+			index = sln.new_index(shared) if sln.path and os.path.isdir(sln.path) else None
+			result['success'], result['message'] = sln.generate_cmake(index, result)
+	result['seconds'] = time.perf_counter() - start
+	return result
+
+# ----------------------------------------------------------------------
+##	Generate a group of configs in one process, sharing their scan cache
+#	@param	filepaths	Configs whose solutions are nested in one another
+def generate_group(filepaths):
+	shared = {}
+	return [generate_from_config(filepath, shared) for filepath in filepaths]
+
+# ----------------------------------------------------------------------
+##	Expand command line arguments into config files
+#	@param	configs		Array of config files or solution directories
+#	@param	recursive	Search directories for configs at any depth
+def collect_configs(configs, recursive=False):
+	out = []
+	for arg in configs:
+		if not recursive or not os.path.isdir(arg):
+			out.append(find_config(arg))
+			continue
+		for dirpath, dirnames, filenames in os.walk(arg):
+			dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+			if FILENAME_CONFIG in filenames or FILENAME_CONFIG_COMPACT in filenames:
+				out.append(find_config(dirpath))
+	return out
+
+# ----------------------------------------------------------------------
+##	Group configs whose solution directories are nested, so they can share a scan cache
+def group_configs(filepaths):
+	groups = []
+	top = None
+	for filepath in sorted(filepaths, key=lambda f: os.path.abspath(os.path.dirname(f))):
+		dirname = os.path.abspath(os.path.dirname(filepath))
+		if top is not None and (dirname + os.sep).startswith(top + os.sep):
+			groups[-1].append(filepath)
+		else:
+			top = dirname
+			groups.append([filepath])
+	return groups
+
+# ----------------------------------------------------------------------
+##	Generate every config given on the command line
+#	@param	configs		Array of config files or solution directories
+#	@param	jobs		Number of worker processes
+#	@param	recursive	Search directories for configs at any depth
+def run_generate(configs, jobs=None, recursive=False):
+	filepaths = collect_configs(configs, recursive)
+	if len(filepaths) == 0:
+		sys.stderr.write('Error: No config given to generate\n')
+		return 1
+	start = time.perf_counter()
+	groups = group_configs(filepaths)
+	jobs = max(1, min(jobs or os.cpu_count() or 1, len(groups)))
+	results = []
+	if jobs == 1:
+		for group in groups:
+			results.extend(generate_group(group))
+	else:
+		initializer = enable_profiler if current_profiler is not None else None
+		with concurrent.futures.ProcessPoolExecutor(jobs, initializer=initializer) as pool:
+			for group_results in pool.map(generate_group, groups):
+				results.extend(group_results)
+	elapsed = time.perf_counter() - start
+	if current_profiler is not None:
+		for result in results:
+			current_profiler.merge(result['config'], result.pop('profile'))
+	
+	updated = 0
+	unchanged = 0
+	failed = 0
+	for result in results:
+		if not result['success']:
+			failed += 1
+			sys.stderr.write(f"FAILED   {result['seconds']:7.3f}s  {result['config']}: {result['message']}\n")
+		elif result['written']:
+			updated += 1
+			sys.stdout.write(f"UPDATED  {result['seconds']:7.3f}s  {result['config']} ({len(result['written'])} written)\n")
+		else:
+			unchanged += 1
+			sys.stdout.write(f"SKIPPED  {result['seconds']:7.3f}s  {result['config']} (unchanged)\n")
+	if len(results) > 1:
+		sys.stdout.write(f"{len(results)} solution(s) in {elapsed:.3f}s with {jobs} job(s): "
+			f"{updated} updated, {unchanged} unchanged, {failed} failed\n")
+	return 1 if failed else 0
+
+# ----------------------------------------------------------------------
+##	Report the include directories each project uses, and those it lacks
+#	@param	configs		Array of config files or solution directories
+#	@param	jobs		Number of worker processes parsing changed files
+def run_includes(configs, jobs=None):
+	if len(configs) == 0:
+		sys.stderr.write('Error: No config given to scan\n')
+		return 1
+	status = 0
+	for arg in configs:
+		filepath = find_config(arg)
+		if not os.path.isfile(filepath):
+			sys.stderr.write('Error: File not found: ' + filepath + '\n')
+			status = 1
+			continue
+		start = time.perf_counter()
+		sln = solution()
+		try:
+			sln.load(filepath)
+		except Exception as e:
+			sys.stderr.write(f"Error: Failed to load {filepath}: {str(e)}\n")
+			status = 1
+			continue
+		index = sln.new_index()
+		scanner = include_scanner(sln.path, jobs)
+		for proj in sln.projects:
+			result = proj.scan_includes(index, scanner)
+			listed = len(result['used']) + len(result['unused'])
+			sys.stdout.write(f"{proj.name}: {len(result['used'])} of {listed} include directories used, "
+				f"{result['unresolved']} include(s) not found in the tree\n")
+			for info in result['unused']:
+				sys.stdout.write(f"  UNUSED   {info.get_cmake_path()}\n")
+			for dirname, count in sorted(result['missing'].items()):
+				sys.stdout.write(f"  MISSING  {dirname} ({count} include(s))\n")
+		scanner.save()
+		index.save()
+		sys.stdout.write(f"{filepath}: {scanner.parsed} file(s) parsed, {scanner.cached} cached, "
+			f"{time.perf_counter() - start:.3f}s\n")
+	return status
+
+# ----------------------------------------------------------------------
+##	Files written by the generator itself, ignored by the watchers
+def is_generated_name(name):
+	return name.startswith('.') or name in (FILENAME_CMAKE, FILENAME_INDEX, FILENAME_PRESETS)
+
+# ----------------------------------------------------------------------
+##	Whether the watchers follow a directory
+#	Hidden directories, the skipped ones and CMake build trees are left out with everything below them.
+#	@param	root	Solution directory
+#	@param	skip	Set of directories relative to root, '/' separated
+def is_watched_dir(path, root, skip):
+	if path == root:
+		return True
+	name = os.path.basename(path)
+	if name.startswith('.') or name == DIRNAME_CMAKE_FILES:
+		return False
+	if skip and os.path.relpath(path, root).replace(os.sep, '/') in skip:
+		return False
+	return not os.path.isfile(os.path.join(path, FILENAME_CMAKE_CACHE))
+
+##	Directories the watchers follow below top, top included
+def iter_watched_dirs(top, root, skip):
+	if not is_watched_dir(top, root, skip):
+		return
+	yield top
+	for dirpath, dirnames, filenames in os.walk(top):
+		dirnames[:] = [name for name in dirnames if is_watched_dir(os.path.join(dirpath, name), root, skip)]
+		for name in dirnames:
+			yield os.path.join(dirpath, name)
+
+# ----------------------------------------------------------------------
+##	Recursive directory watch through Linux inotify
+#	Directories left out by is_watched_dir() are not watched.
+class inotify_watcher:
+	"""Constructor
+	@param	in_skip		Directories relative to in_root never watched, like solution.get_build_dirs()"""
+	def __init__(self, in_root, in_skip=()):
+		self.root = in_root
+		self.skip = set(in_skip)
+		self.libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+		self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		if self.fd < 0:
+			raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+		self.mask = IN_CLOSE_WRITE | IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+		self.wds = {}		# watch descriptor -> directory
+		try:
+			self._add_tree(in_root)
+		except OSError:
+			self.close()
+			raise
+
+	def _add(self, path):
+		wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask)
+		if wd < 0:
+			raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+		self.wds[wd] = path
+
+	def _add_tree(self, top):
+		for path in iter_watched_dirs(top, self.root, self.skip):
+			self._add(path)
+
+	def _remove_tree(self, top):
+		for wd, path in list(self.wds.items()):
+			if path == top or path.startswith(top + os.sep):
+				self.libc.inotify_rm_watch(self.fd, wd)
+				del self.wds[wd]
+
+	def wait(self, timeout):
+		"""Block up to timeout seconds (None for ever) and return the number of relevant events"""
+		readable, _, _ = select.select([self.fd], [], [], timeout)
+		if not readable:
+			return 0
+		try:
+			data = os.read(self.fd, 65536)
+		except BlockingIOError:
+			return 0
+		count = 0
+		offset = 0
+		while offset + 16 <= len(data):
+			wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+			name = data[offset + 16:offset + 16 + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+			offset += 16 + length
+			if mask & IN_IGNORED:
+				self.wds.pop(wd, None)
+				continue
+			if mask & IN_Q_OVERFLOW:
+				count += 1
+				continue
+			if name and is_generated_name(name) and name != FILENAME_CONFIG:
+				continue
+			# A directory configured by CMake became a build tree; CMake writes the cache through a temporary file
+			if name.startswith(FILENAME_CMAKE_CACHE):
+				if name == FILENAME_CMAKE_CACHE and wd in self.wds and self.wds[wd] != self.root:
+					self._remove_tree(self.wds[wd])
+				continue
+			if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and wd in self.wds:
+				path = os.path.join(self.wds[wd], name)
+				if not is_watched_dir(path, self.root, self.skip):
+					continue
+				try:
+					self._add_tree(path)
+				except OSError:
+					pass
+			count += 1
+		return count
+
+	def rearm(self):
+		pass
+
+	def close(self):
+		if self.fd >= 0:
+			os.close(self.fd)
+			self.fd = -1
+
+# ----------------------------------------------------------------------
+##	Portable directory watch that polls directory mtimes
+#	Listing a directory again is only needed when its own mtime changed.
+class poll_watcher:
+	"""Constructor
+	@param	in_skip		Directories relative to in_root never watched, like solution.get_build_dirs()"""
+	def __init__(self, in_root, in_files, in_skip=()):
+		self.root = in_root
+		self.files = in_files	# Extra files whose content changes count as events
+		self.skip = set(in_skip)
+		self.mtimes = {}
+		self.rearm()
+
+	def _stat(self, path):
+		try:
+			return os.stat(path).st_mtime_ns
+		except OSError:
+			return None
+
+	def _add_tree(self, top):
+		for path in iter_watched_dirs(top, self.root, self.skip):
+			self.mtimes[path] = self._stat(path)
+
+	def _changes(self):
+		changed = [path for path, mtime in self.mtimes.items() if self._stat(path) != mtime]
+		for path in changed:
+			self._add_tree(path)
+		return len(changed)
+
+	def wait(self, timeout):
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while True:
+			count = self._changes()
+			if count:
+				return count
+			if deadline is not None and time.monotonic() >= deadline:
+				return 0
+			delay = WATCH_POLL_INTERVAL if deadline is None else min(WATCH_POLL_INTERVAL, max(0.0, deadline - time.monotonic()))
+			time.sleep(delay)
+
+	def rearm(self):
+		"""Forget changes made by the generator itself"""
+		self.mtimes = {}
+		self._add_tree(self.root)
+		for path in self.files:
+			self.mtimes[path] = self._stat(path)
+
+	def close(self):
+		pass
+
+# ----------------------------------------------------------------------
+##	Watch a solution and regenerate when its source set or config changes
+#	@param	filepath	Path to CMakeConfig.json
+#	@param	poll		Use the polling watcher even where inotify is available
+def run_watch(filepath, poll=False):
+	if not os.path.isfile(filepath):
+		sys.stderr.write('Error: File not found: ' + filepath + '\n')
+		return 1
+	sln = solution()
+	try:
+		sln.load(filepath)
+	except Exception as e:
+		sys.stderr.write(f"Error: Failed to load {filepath}: {str(e)}\n")
+		return 1
+	index = sln.new_index()
+	watcher = None
+	if not poll and sys.platform.startswith('linux'):
+		try:
+			watcher = inotify_watcher(sln.path, sln.get_build_dirs())
+		except OSError as e:
+			sys.stderr.write(f'Warning: inotify unavailable ({e}), falling back to polling\n')
+	if watcher is None:
+		watcher = poll_watcher(sln.path, [filepath], sln.get_build_dirs())
+	config_mtime = os.stat(filepath).st_mtime_ns
+	prints = {proj.name: proj.fingerprint(index) for proj in sln.projects}
+	success, message = sln.generate_cmake(index)
+	watcher.rearm()
+	sys.stdout.write(message + '\n')
+	sys.stdout.write(f'Watching {sln.path} ({type(watcher).__name__}), press Ctrl+C to stop\n')
+	sys.stdout.flush()
+	try:
+		while True:
+			events = watcher.wait(None)
+			if events == 0:
+				continue
+			first = time.perf_counter()
+			while True:
+				n = watcher.wait(WATCH_DEBOUNCE)
+				if n == 0:
+					break
+				events += n
+			start = time.perf_counter()
+			try:
+				mtime = os.stat(filepath).st_mtime_ns
+			except OSError:
+				mtime = config_mtime
+			changed = []
+			if mtime != config_mtime:
+				config_mtime = mtime
+				# Load into a new solution, so a config saved mid-edit keeps the previous one
+				loaded = solution()
+				try:
+					loaded.load(filepath)
+				except Exception as e:
+					sys.stderr.write(f"Error: Failed to load {filepath}: {str(e)}; keeping the previous config\n")
+				else:
+					sln = loaded
+					index.skip = watcher.skip = set(sln.get_build_dirs())
+					changed = [proj.name for proj in sln.projects]
+			new_prints = {proj.name: proj.fingerprint(index) for proj in sln.projects}
+			for name, digest in new_prints.items():
+				if prints.get(name) != digest and name not in changed:
+					changed.append(name)
+			prints = new_prints
+			if changed:
+				success, message = sln.generate_cmake(index)
+				if not success:
+					message = 'Error: ' + message
+			else:
+				message = 'Source sets unchanged'
+			watcher.rearm()
+			end = time.perf_counter()
+			sys.stdout.write(f"[{time.strftime('%H:%M:%S')}] {events} event(s)"
+				f"{', changed: ' + ', '.join(changed) if changed else ''}; {message}"
+				f" ({(end - start) * 1000:.1f} ms, {(end - first) * 1000:.1f} ms after first event)\n")
+			sys.stdout.flush()
+	except KeyboardInterrupt:
+		return 0
+	finally:
+		watcher.close()
+
+# ----------------------------------------------------------------------
+def run_gui(filename):
+	global flet
+	global current_solution
+	global current_window
+	import flet
+	current_solution = solution()
+	if filename is not None:
+		filename = find_config(filename)
+		if os.path.isfile(filename):
+			current_solution.load(filename)
+		else:
+			sys.stdout.write('Error: File not found: ' + filename + '\n')
+	current_window = window(current_solution)
+	flet.app(target=main)
+	return 0
+
+# ----------------------------------------------------------------------
+def parse_args(argv):
+	parser = argparse.ArgumentParser(description="CMakeLists.txt generator")
+	parser.add_argument("configs", nargs="*",
+		help="CMakeConfig.json files or solution directories")
+	parser.add_argument("-g", "--generate", "--batch", dest="generate", action="store_true",
+		help="generate CMakeLists.txt for every config without starting the GUI")
+	parser.add_argument("-j", "--jobs", type=int, default=None,
+		help="with --generate or --includes, number of worker processes (default: CPU count)")
+	parser.add_argument("-r", "--recursive", action="store_true",
+		help="with --generate, search directories for configs at any depth")
+	parser.add_argument("--convert", action="store_true",
+		help="convert each config between CMakeConfig.json and the compact CMakeConfig.cmgc format")
+	parser.add_argument("--includes", action="store_true",
+		help="report the include directories each project uses, never uses, or lacks")
+	parser.add_argument("-w", "--watch", action="store_true",
+		help="regenerate CMakeLists.txt whenever the solution's sources or config change")
+	parser.add_argument("--poll", action="store_true",
+		help="with --watch, poll directory mtimes instead of using inotify")
+	parser.add_argument("--profile", metavar="REPORT", default=os.environ.get(ENV_PROFILE) or None,
+		help=f"write per-phase timings and per-project counts as JSON (or set {ENV_PROFILE})")
+	parser.add_argument("--cprofile", metavar="FILE", default=os.environ.get(ENV_CPROFILE) or None,
+		help=f"dump cProfile statistics of the main process (or set {ENV_CPROFILE})")
+	return parser.parse_args(argv)
+
+# ----------------------------------------------------------------------
+def run(argv):
+	global current_profiler
+	args = parse_args(argv)
+	if args.profile:
+		current_profiler = profiler()
+	stats = None
+	if args.cprofile:
+		stats = cProfile.Profile()
+		stats.enable()
+	try:
+		return run_command(args)
+	finally:
+		if stats is not None:
+			stats.disable()
+			stats.dump_stats(args.cprofile)
+		if current_profiler is not None:
+			current_profiler.save(args.profile, argv)
+			current_profiler = None
+
+# ----------------------------------------------------------------------
+def run_command(args):
+	if args.convert:
+		return run_convert(args.configs)
+	if args.generate:
+		return run_generate(args.configs, args.jobs, args.recursive)
+	if args.includes:
+		return run_includes(args.configs, args.jobs)
+	if args.watch:
+		if len(args.configs) != 1:
+			sys.stderr.write('Error: --watch takes exactly one config\n')
+			return 1
+		return run_watch(find_config(args.configs[0]), args.poll)
+	if len(args.configs) > 1:
+		sys.stderr.write('Error: The GUI opens a single config; use --generate for several\n')
+		return 1
+	return run_gui(args.configs[0] if args.configs else None)
+
+if __name__ == "__main__":
+	sys.exit(run(sys.argv[1:]))